@@ -568,6 +568,8 @@ def ingest_contributors(db: Session, repo: models.Repository, report_path: Path)
     - commit_percentage
     - files_contributed (with severity data)
     - folders_contributed
+      (files_count, folders_count and highest_severity are derived from both
+      lists by the Contributor model)
     - risk_score (calculated)
     - ai_summary (optional)
     """
@@ -55,7 +55,8 @@ def run_migration():
                 author_id UUID REFERENCES users(id),
                 is_ai_generated BOOLEAN DEFAULT FALSE,
                 ai_prompt TEXT,
-                created_at TIMESTAMP DEFAULT NOW()
+                created_at TIMESTAMP DEFAULT NOW(),
+                updated_at TIMESTAMP DEFAULT NOW()
             )
         """)
         print("   ✓ journal_entries table created")
@@ -66,8 +67,8 @@ def run_migration():
     print("\n3. Creating indexes...")
     try:
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_journal_entries_finding_id 
-            ON journal_entries(finding_id)
+            CREATE INDEX IF NOT EXISTS idx_journal_entries_finding_created 
+            ON journal_entries(finding_id, created_at DESC)
         """)
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_findings_investigation_status 
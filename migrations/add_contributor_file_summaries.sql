@@ -0,0 +1,34 @@
+-- Stored file/folder summaries for the contributors table
+-- (GET /projects/{id}/contributors in src/api/routers/projects.py)
+--
+-- files_count, folders_count and highest_severity used to be recomputed from
+-- the files_contributed / folders_contributed JSON on every read. The
+-- Contributor model now fills them in whenever those lists are written; this
+-- adds the columns and backfills existing rows with the same rules:
+-- highest_severity is the first file severity by critical > high > medium >
+-- low > anything else, ignoring files without one.
+--
+-- Apply with:
+--   cat migrations/add_contributor_file_summaries.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE contributors
+ADD COLUMN IF NOT EXISTS files_count INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS folders_count INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS highest_severity VARCHAR;
+
+UPDATE contributors c
+SET files_count = COALESCE(jsonb_array_length(c.files_contributed), 0),
+    folders_count = COALESCE(jsonb_array_length(c.folders_contributed), 0),
+    highest_severity = (
+        SELECT f.file->>'severity'
+        FROM jsonb_array_elements(COALESCE(c.files_contributed, '[]'::jsonb)) WITH ORDINALITY AS f(file, pos)
+        WHERE COALESCE(f.file->>'severity', '') <> ''
+        ORDER BY CASE f.file->>'severity'
+                     WHEN 'critical' THEN 0
+                     WHEN 'high' THEN 1
+                     WHEN 'medium' THEN 2
+                     WHEN 'low' THEN 3
+                     ELSE 99
+                 END, f.pos
+        LIMIT 1
+    );
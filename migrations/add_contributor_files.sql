@@ -0,0 +1,31 @@
+-- Normalized contributor file list (contributor_files)
+--
+-- GET /projects/{id}/contributors/{contributor_id} counts a contributor's
+-- files per severity. Those counts now come from a GROUP BY over this table
+-- instead of walking contributors.files_contributed in Python. The JSON column
+-- is kept (the detail view still returns the list, and older API versions read
+-- it); the Contributor model writes both whenever files_contributed is set.
+--
+-- Rows go away with their contributor via ON DELETE CASCADE, which also covers
+-- the bulk delete ingest_contributors() does before re-inserting.
+--
+-- Apply with:
+--   cat migrations/add_contributor_files.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE TABLE IF NOT EXISTS contributor_files (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    contributor_id UUID NOT NULL REFERENCES contributors(id) ON DELETE CASCADE,
+    file_path VARCHAR NOT NULL,
+    severity VARCHAR,
+    findings_count INTEGER DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS ix_contributor_files_contributor_id ON contributor_files(contributor_id);
+
+-- Backfill from the JSON lists of contributors that have no rows yet
+INSERT INTO contributor_files (contributor_id, file_path, severity, findings_count)
+SELECT c.id, f.file->>'path', f.file->>'severity', COALESCE((f.file->>'findings_count')::int, 0)
+FROM contributors c
+CROSS JOIN LATERAL jsonb_array_elements(COALESCE(c.files_contributed, '[]'::jsonb)) AS f(file)
+WHERE COALESCE(f.file->>'path', '') <> ''
+  AND NOT EXISTS (SELECT 1 FROM contributor_files cf WHERE cf.contributor_id = c.id);
@@ -0,0 +1,18 @@
+-- Indexes for the dependency / finding / analysis join in
+-- GET /projects/{id}/dependencies (src/api/routers/projects.py)
+--
+-- The endpoint joins the repository's dependencies to its package findings on
+-- (name, version) and to component_analysis on (name, version, manager) in one
+-- query. component_analysis is already covered by uq_component_analysis; these
+-- give the other two sides a per-repository index so the plan stays a couple
+-- of index scans plus a join however many dependencies a repository has.
+--
+-- CONCURRENTLY avoids blocking writes while the indexes build; run statements
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_dependency_join_indexes.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dependencies_repository ON dependencies(repository_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_repo_package ON findings(repository_id, package_name, package_version) WHERE package_name IS NOT NULL;
@@ -0,0 +1,22 @@
+-- Materialized finding/file match counts for GET /github/sync-status?approximate=true
+-- (src/api/routers/github_sync.py)
+--
+-- The exact status scans all findings with an EXISTS probe into file_commits.
+-- This view holds the result of that scan. It is refreshed CONCURRENTLY after
+-- each background file sync job, so approximate polls read one row instead.
+-- The unique index is required for REFRESH ... CONCURRENTLY.
+--
+-- Apply with:
+--   cat migrations/add_finding_sync_counts_view.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_finding_sync_counts AS
+SELECT
+    1 AS id,
+    COUNT(DISTINCT f.file_path) AS total_finding_files,
+    COUNT(*) FILTER (WHERE EXISTS (
+        SELECT 1 FROM file_commits fc
+        WHERE fc.repository_id = f.repository_id AND fc.file_path = f.file_path
+    )) AS findings_with_file_data
+FROM findings f;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_finding_sync_counts_id ON mv_finding_sync_counts(id);
@@ -0,0 +1,13 @@
+-- Partial index for the Jira webhook lookup in src/api/routers/jira.py
+--
+-- Every jira:issue_updated event runs WHERE jira_ticket_key = ?. Without an
+-- index that is a sequential scan of findings per event. Only a small share of
+-- findings have a ticket, so the index is restricted to those rows.
+--
+-- CONCURRENTLY avoids blocking finding writes while the index builds; run
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_findings_jira_ticket_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_jira_ticket_key ON findings(jira_ticket_key) WHERE jira_ticket_key IS NOT NULL;
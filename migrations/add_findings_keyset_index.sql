@@ -0,0 +1,11 @@
+-- Keyset pagination index for GET /findings/?order_by=created_at
+-- (src/api/routers/findings.py)
+--
+-- Pages are fetched with WHERE (created_at, id) < (cursor) ORDER BY
+-- created_at DESC, id DESC, which this index serves as a range scan
+-- regardless of page depth.
+--
+-- Apply with:
+--   cat migrations/add_findings_keyset_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX IF NOT EXISTS idx_findings_created_id ON findings(created_at DESC, id DESC);
@@ -0,0 +1,47 @@
+-- Add a stored language column to findings so GET /projects/{id}/languages
+-- can count open findings per (language, severity) in one grouped query instead
+-- of mapping file extensions in Python.
+--
+-- The extension follows os.path.splitext (last ".suffix" of the basename,
+-- ignoring leading dots, lowercased). Keep the CASE in sync with
+-- FINDING_LANGUAGE_BY_EXTENSION in src/api/models.py.
+--
+-- Adding a stored generated column rewrites the findings table under an
+-- exclusive lock; run it in a quiet window.
+--
+-- Apply with:
+--   cat migrations/add_findings_language.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE findings
+ADD COLUMN IF NOT EXISTS language VARCHAR GENERATED ALWAYS AS (
+    CASE lower(substring(file_path from '^(?:.*/)?\.*[^/.][^/]*(\.[^./]*)$'))
+        WHEN '.py' THEN 'Python'
+        WHEN '.js' THEN 'JavaScript'
+        WHEN '.ts' THEN 'TypeScript'
+        WHEN '.tsx' THEN 'TypeScript'
+        WHEN '.jsx' THEN 'JavaScript'
+        WHEN '.go' THEN 'Go'
+        WHEN '.java' THEN 'Java'
+        WHEN '.c' THEN 'C'
+        WHEN '.cpp' THEN 'C++'
+        WHEN '.rb' THEN 'Ruby'
+        WHEN '.php' THEN 'PHP'
+        WHEN '.rs' THEN 'Rust'
+        WHEN '.html' THEN 'HTML'
+        WHEN '.css' THEN 'CSS'
+        WHEN '.sh' THEN 'Shell'
+        WHEN '.yml' THEN 'YAML'
+        WHEN '.yaml' THEN 'YAML'
+        WHEN '.json' THEN 'JSON'
+        WHEN '.md' THEN 'Markdown'
+        WHEN '.sql' THEN 'SQL'
+        WHEN '.dockerfile' THEN 'Docker'
+        WHEN '.tf' THEN 'HCL'
+        ELSE 'Other'
+    END
+) STORED;
+
+-- Per-project language breakdown of open findings
+CREATE INDEX IF NOT EXISTS idx_findings_repo_lang_open ON findings(repository_id, language, severity) WHERE status = 'open';
+
+COMMENT ON COLUMN findings.language IS 'Generated language from the file_path extension (Other if unknown)';
@@ -0,0 +1,18 @@
+-- Indexes for the hot WHERE / ORDER BY patterns in the findings API
+-- (src/api/routers/findings.py)
+--
+-- findings.finding_uuid is already UNIQUE, so it has a backing index and
+-- needs nothing extra here.
+--
+-- Apply with:
+--   cat migrations/add_findings_query_indexes.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+-- Exception rule count, delete dry-run and global delete all match on
+-- (scanner_name, file_path)
+CREATE INDEX IF NOT EXISTS idx_findings_scanner_path ON findings(scanner_name, file_path);
+
+-- Severity filter on the findings list, newest first
+CREATE INDEX IF NOT EXISTS idx_findings_severity_created ON findings(severity, created_at DESC);
+
+-- Description version history: WHERE finding_id = ? AND change_type = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_finding_history_finding_type ON finding_history(finding_id, change_type, created_at DESC);
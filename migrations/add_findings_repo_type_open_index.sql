@@ -0,0 +1,16 @@
+-- Partial index for the per-project finding tabs in src/api/routers/projects.py
+--
+-- GET /projects/{id}/findings?type=... (and the legacy /secrets, /sast,
+-- /terraform and /oss routes) all filter on
+--   repository_id = ? AND finding_type = ? AND status = 'open'
+-- Only open findings are indexed, which keeps the index small as findings get
+-- resolved. title/description are deliberately not INCLUDEd: long text values
+-- can exceed the btree tuple size limit and would make inserts fail.
+--
+-- CONCURRENTLY avoids blocking writes while the index builds; run statements
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_findings_repo_type_open_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_repo_type_open ON findings(repository_id, finding_type) WHERE status = 'open';
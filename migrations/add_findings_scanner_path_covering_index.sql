@@ -0,0 +1,17 @@
+-- Make the (scanner_name, file_path) index covering for the global-scope
+-- exception paths in src/api/routers/findings.py
+--
+-- The capped match count and the global DELETE ... WHERE id IN (SELECT id ...)
+-- only read findings.id, so carrying it in the index lets both run as
+-- index-only scans. Replaces idx_findings_scanner_path from
+-- add_findings_query_indexes.sql.
+--
+-- CONCURRENTLY avoids blocking writes while the index builds; run statements
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_findings_scanner_path_covering_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_scanner_path_id ON findings(scanner_name, file_path) INCLUDE (id);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_findings_scanner_path;
@@ -0,0 +1,30 @@
+-- Add a stored severity_rank column so severity ordering can use an index
+-- instead of computing a CASE per row and sorting.
+--
+-- The rank is case-insensitive, so mixed-case values such as 'High' sort
+-- with their lowercase form. Databases that already have the column get the
+-- lower() version from recreate_findings_severity_rank.sql.
+--
+-- Keep the CASE in sync with Finding.severity_rank in src/api/models.py and
+-- SEVERITY_PRIORITY in src/api/routers/findings.py.
+--
+-- Apply with:
+--   cat migrations/add_findings_severity_rank.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE findings
+ADD COLUMN IF NOT EXISTS severity_rank SMALLINT GENERATED ALWAYS AS (
+    CASE lower(severity)
+        WHEN 'critical' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'medium' THEN 3
+        WHEN 'low' THEN 4
+        WHEN 'info' THEN 5
+        WHEN 'warning' THEN 6
+        ELSE 7
+    END
+) STORED;
+
+-- Default findings list order: severity, newest first
+CREATE INDEX IF NOT EXISTS idx_findings_rank_created ON findings(severity_rank, created_at DESC);
+
+COMMENT ON COLUMN findings.severity_rank IS 'Generated sort key for severity, case-insensitive (critical=1 ... warning=6, other=7)';
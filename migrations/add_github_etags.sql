@@ -0,0 +1,9 @@
+-- Store GitHub ETags so metadata syncs can use conditional requests
+-- (src/api/routers/github_sync.py). A 304 Not Modified answer does not count
+-- against the GitHub rate limit and means the stored row is current.
+--
+-- Apply with:
+--   cat migrations/add_github_etags.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS github_etag VARCHAR;
+ALTER TABLE file_commits ADD COLUMN IF NOT EXISTS github_etag VARCHAR;
@@ -0,0 +1,13 @@
+-- Edit timestamp for investigation journal entries
+--
+-- get_investigation_status in src/api/routers/findings.py caches serialized
+-- journal entries per finding and validates them against the journal version
+-- (latest created_at, latest updated_at, entry count). Editing an entry leaves
+-- created_at and the count unchanged, so updated_at is what lets other API
+-- workers notice the edit. Existing rows start with the time the column is
+-- added.
+--
+-- Apply with:
+--   cat migrations/add_journal_entries_updated_at.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE journal_entries ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
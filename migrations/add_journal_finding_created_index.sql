@@ -0,0 +1,19 @@
+-- Composite index for the investigation journal reads in
+-- src/api/routers/findings.py
+--
+-- get_investigation_status and ask_journal_ai both run
+-- WHERE finding_id = ? ORDER BY created_at DESC [LIMIT 10], and the journal
+-- version check takes MAX(created_at) per finding. With this index they are
+-- ordered index scans with no sort step. It also serves plain finding_id
+-- lookups, so it replaces idx_journal_entries_finding_id from
+-- migrate_journal.py.
+--
+-- CONCURRENTLY avoids blocking journal writes while the index builds; run
+-- statements outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_journal_finding_created_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_journal_entries_finding_created ON journal_entries(finding_id, created_at DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_journal_entries_finding_id;
@@ -0,0 +1,25 @@
+-- Covering / ordered indexes for the project endpoints in
+-- src/api/routers/projects.py
+--
+-- * findings(repository_id, status) INCLUDE (finding_type, severity,
+--   severity_rank) serves the per-repository open-finding roll-ups
+--   (GET /projects/ counts and highest SAST severity, GET /projects/{id} open
+--   count) as index-only scans.
+--   Text columns (title, description, file_path) are deliberately left out:
+--   long values can exceed the btree tuple size limit and would make finding
+--   inserts fail. The finding tabs use idx_findings_repo_type_open instead.
+-- * scan_runs(repository_id, created_at DESC) backs GET /projects/{id}/runs
+--   (newest 50 runs) without a sort.
+--
+-- get_project_contributors' ORDER BY commits DESC LIMIT n is already served by
+-- idx_contributors_repo_commits (add_contributor_enhancements.sql).
+--
+-- CONCURRENTLY avoids blocking writes while the indexes build; run statements
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_project_covering_indexes.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_repo_status ON findings(repository_id, status) INCLUDE (finding_type, severity, severity_rank);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scan_runs_repo_created ON scan_runs(repository_id, created_at DESC);
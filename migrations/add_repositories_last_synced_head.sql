@@ -0,0 +1,8 @@
+-- Default branch HEAD at the last complete file commit sync
+-- (src/api/routers/github_sync.py). When the branch has not moved since, bulk
+-- syncs skip the GitHub lookups for files that already have commit data.
+--
+-- Apply with:
+--   cat migrations/add_repositories_last_synced_head.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS last_synced_head_sha VARCHAR(40);
@@ -0,0 +1,19 @@
+-- Partial index for the scan queue in src/api/scan_worker.py
+--
+-- Each worker poll runs WHERE status = 'queued' ORDER BY created_at LIMIT 1
+-- FOR UPDATE SKIP LOCKED, and POST /scans counts queued and running scans for
+-- admission control. scan_runs keeps every historical run, so without an
+-- index both scan the whole table. Only active runs are indexed, which keeps
+-- the index tiny.
+--
+-- GET /scans/{scan_id} is a primary key lookup, and the per-repository run
+-- history is served by idx_scan_runs_repo_created
+-- (add_project_covering_indexes.sql); neither needs a new index.
+--
+-- CONCURRENTLY avoids blocking scan writes while the index builds; run
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_scan_queue_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scan_runs_active ON scan_runs(created_at) WHERE status IN ('queued', 'running');
@@ -0,0 +1,14 @@
+-- Index for the project cache freshness check in src/api/routers/projects.py
+--
+-- Cached project responses are only served while max(scan_runs.completed_at)
+-- is unchanged; the scan worker sets completed_at after ingesting a scan. The
+-- API runs that max() on every cached project request, which this index turns
+-- into a single index probe.
+--
+-- CONCURRENTLY avoids blocking scan writes while the index builds; run
+-- outside an explicit transaction.
+--
+-- Apply with:
+--   cat migrations/add_scan_runs_completed_index.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scan_runs_completed_at ON scan_runs(completed_at);
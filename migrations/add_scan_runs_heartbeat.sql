@@ -0,0 +1,12 @@
+-- Heartbeat for scans run by src/api/scan_worker.py
+--
+-- The worker refreshes heartbeat_at about once a minute while a scan (and
+-- its ingestion) runs. A 'running' scan whose heartbeat is older than
+-- SCAN_STALE_AFTER (src/api/routers/scans.py) lost its worker to a crash,
+-- OOM kill or SIGTERM; the next worker poll marks it failed, and POST /scans
+-- no longer counts it towards MAX_ACTIVE_SCANS.
+--
+-- Apply with:
+--   cat migrations/add_scan_runs_heartbeat.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+ALTER TABLE scan_runs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
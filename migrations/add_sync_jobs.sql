@@ -0,0 +1,26 @@
+-- Background GitHub sync jobs (sync_jobs)
+--
+-- POST /github/sync-all-files records its progress here so clients can poll
+-- GET /github/sync-jobs/{job_id} and GET /github/sync-status. Only one file
+-- sync runs at a time: the endpoint looks for a queued/running job of type
+-- 'files' (under an advisory lock) before creating one, which the partial
+-- index below serves.
+--
+-- Apply with:
+--   cat migrations/add_sync_jobs.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+CREATE TABLE IF NOT EXISTS sync_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_type VARCHAR NOT NULL,
+    status VARCHAR NOT NULL DEFAULT 'queued',
+    total_items INTEGER DEFAULT 0,
+    items_synced INTEGER DEFAULT 0,
+    items_failed INTEGER DEFAULT 0,
+    error_message TEXT,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_jobs_active ON sync_jobs(job_type, created_at DESC) WHERE status IN ('queued', 'running');
@@ -0,0 +1,40 @@
+-- Recreate findings.severity_rank with a case-insensitive CASE
+--
+-- The column from add_findings_severity_rank.sql compared severity as stored,
+-- so mixed-case values such as 'High' ranked as unknown (7). A generated
+-- column's expression can't be altered in place, so it is dropped (together
+-- with the indexes that use it) and added back on lower(severity), matching
+-- Finding.severity_rank in src/api/models.py. Adding the column rewrites the
+-- findings table; run it in a quiet window.
+--
+-- The index statements use CONCURRENTLY; run this file outside an explicit
+-- transaction.
+--
+-- Apply with:
+--   cat migrations/recreate_findings_severity_rank.sql | docker-compose exec -T db psql -U auditgh -d auditgh_kb
+
+DROP INDEX IF EXISTS idx_findings_rank_created;
+DROP INDEX IF EXISTS idx_findings_repo_status;
+
+ALTER TABLE findings DROP COLUMN IF EXISTS severity_rank;
+
+ALTER TABLE findings
+ADD COLUMN severity_rank SMALLINT GENERATED ALWAYS AS (
+    CASE lower(severity)
+        WHEN 'critical' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'medium' THEN 3
+        WHEN 'low' THEN 4
+        WHEN 'info' THEN 5
+        WHEN 'warning' THEN 6
+        ELSE 7
+    END
+) STORED;
+
+COMMENT ON COLUMN findings.severity_rank IS 'Generated sort key for severity, case-insensitive (critical=1 ... warning=6, other=7)';
+
+-- Default findings list order: severity, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_rank_created ON findings(severity_rank, created_at DESC);
+
+-- Project roll-ups (see add_project_covering_indexes.sql)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_findings_repo_status ON findings(repository_id, status) INCLUDE (finding_type, severity, severity_rank);
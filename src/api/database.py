@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -11,10 +12,32 @@ POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD", "auditgh_secret")
 POSTGRES_DB = os.environ.get("POSTGRES_DB", "auditgh_kb")
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+SQLALCHEMY_ASYNC_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Connection pool settings, shared by the sync and async engines. The defaults
+# (5 + 10 overflow) are too small for FastAPI's threadpool under concurrent load.
+# Pre-ping and recycling drop connections closed by the server or a proxy.
+POOL_OPTIONS = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "3600")),
+    "pool_pre_ping": True,
+}
+
+# psycopg2 batches executemany() UPDATEs/DELETEs (e.g. bulk updates by primary
+# key) into pages instead of one round trip per row; INSERTs already use VALUES.
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    executemany_mode="values_plus_batch",
+    **POOL_OPTIONS
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for endpoints that await the database instead of holding a worker thread
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -24,3 +47,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency for getting an async DB session."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -43,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Before-Created-At", "X-Next-Before-Id"],  # findings keyset cursor
 )
 
 @app.get("/")
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, JSON, Numeric, Sequence, UniqueConstraint
+from sqlalchemy import Column, String, Integer, SmallInteger, Boolean, DateTime, ForeignKey, Text, JSON, Numeric, Sequence, UniqueConstraint, Computed
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func, text
 from .database import Base
+from datetime import datetime
+import uuid
 
 class Repository(Base):
     __tablename__ = "repositories"
@@ -39,6 +41,8 @@ class Repository(Base):
     has_wiki = Column(Boolean, default=False)
     has_pages = Column(Boolean, default=False)
     has_discussions = Column(Boolean, default=False)
+    github_etag = Column(String)  # ETag of the last repo metadata response, for conditional syncs
+    last_synced_head_sha = Column(String(40))  # Default branch HEAD when file commits were last fully synced
 
     # Self-annealing: Track problematic repos
     failure_count = Column(Integer, default=0)
@@ -76,6 +80,7 @@ class FileCommit(Base):
     last_commit_date = Column(DateTime)
     last_commit_author = Column(String)
     last_commit_message = Column(Text)
+    github_etag = Column(String)  # ETag of the last commits response, for conditional refreshes
     
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -87,6 +92,23 @@ class FileCommit(Base):
     )
 
 
+class SyncJob(Base):
+    """Tracks a background GitHub sync so clients can poll its progress."""
+    __tablename__ = "sync_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
+    job_type = Column(String, nullable=False)  # files
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    total_items = Column(Integer, default=0)
+    items_synced = Column(Integer, default=0)
+    items_failed = Column(Integer, default=0)
+    error_message = Column(Text)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 class ScanRun(Base):
     __tablename__ = "scan_runs"
 
@@ -99,6 +121,7 @@ class ScanRun(Base):
     trigger_reference = Column(String)
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # refreshed by the scan worker while running
     duration_seconds = Column(Integer)
     findings_count = Column(Integer)
     new_findings_count = Column(Integer)
@@ -111,6 +134,23 @@ class ScanRun(Base):
     repository = relationship("Repository", back_populates="scan_runs")
     findings = relationship("Finding", back_populates="scan_run")
 
+# File extension -> language for the generated findings.language column
+# (simplified map; anything else, or no extension, is 'Other'). The extension
+# follows os.path.splitext: the last ".suffix" of the basename, ignoring leading
+# dots, lowercased. Keep in sync with migrations/add_findings_language.sql.
+FINDING_LANGUAGE_BY_EXTENSION = {
+    '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', '.tsx': 'TypeScript',
+    '.jsx': 'JavaScript', '.go': 'Go', '.java': 'Java', '.c': 'C', '.cpp': 'C++',
+    '.rb': 'Ruby', '.php': 'PHP', '.rs': 'Rust', '.html': 'HTML', '.css': 'CSS',
+    '.sh': 'Shell', '.yml': 'YAML', '.yaml': 'YAML', '.json': 'JSON', '.md': 'Markdown',
+    '.sql': 'SQL', '.dockerfile': 'Docker', '.tf': 'HCL'
+}
+FINDING_LANGUAGE_SQL = (
+    r"CASE lower(substring(file_path from '^(?:.*/)?\.*[^/.][^/]*(\.[^./]*)$')) "
+    + " ".join(f"WHEN '{ext}' THEN '{lang}'" for ext, lang in FINDING_LANGUAGE_BY_EXTENSION.items())
+    + " ELSE 'Other' END"
+)
+
 class Finding(Base):
     __tablename__ = "findings"
 
@@ -123,10 +163,19 @@ class Finding(Base):
     scanner_name = Column(String)
     finding_type = Column(String)
     severity = Column(String)
+    # Sort key for severity, case-insensitive (critical=1 ... warning=6, anything
+    # else 7), maintained by Postgres
+    severity_rank = Column(SmallInteger, Computed(
+        "CASE lower(severity) WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'medium' THEN 3 "
+        "WHEN 'low' THEN 4 WHEN 'info' THEN 5 WHEN 'warning' THEN 6 ELSE 7 END",
+        persisted=True
+    ))
     title = Column(Text, nullable=False)
     description = Column(Text)
     
     file_path = Column(Text)
+    # Language inferred from the file extension, maintained by Postgres
+    language = Column(String, Computed(FINDING_LANGUAGE_SQL, persisted=True))
     line_start = Column(Integer)
     line_end = Column(Integer)
     code_snippet = Column(Text)
@@ -243,7 +292,9 @@ class JournalEntry(Base):
     """Investigation journal entries for tracking analyst notes and communications."""
     __tablename__ = "journal_entries"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    # Client-side defaults (server defaults kept for raw SQL inserts) so new
+    # entries are complete without a refresh after commit
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
     finding_id = Column(UUID(as_uuid=True), ForeignKey("findings.id"), nullable=False)
     
     # Entry content
@@ -259,7 +310,8 @@ class JournalEntry(Base):
     ai_prompt = Column(Text, nullable=True)  # The question asked to AI
     
     # Timestamps
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     
     # Relationships
     finding = relationship("Finding", back_populates="journal_entries")
@@ -309,6 +361,12 @@ class Contributor(Base):
     files_contributed = Column(JSONB, default=[])
     folders_contributed = Column(JSONB, default=[])  # ["src", "tests", "config", ...]
 
+    # Read-side summaries of the lists above, kept in sync whenever they are
+    # assigned so the contributors table never has to walk the JSON
+    files_count = Column(Integer, default=0)
+    folders_count = Column(Integer, default=0)
+    highest_severity = Column(String)
+
     # Risk and AI analysis
     risk_score = Column(Integer, default=0)  # 0-100 calculated risk
     ai_summary = Column(Text)  # AI-generated contributor analysis
@@ -317,6 +375,48 @@ class Contributor(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     repository = relationship("Repository", back_populates="contributors")
+    # Normalized copy of files_contributed for per-severity counts in SQL
+    files = relationship("ContributorFile", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Unknown severities rank after low but still beat files without one
+    SEVERITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+    @validates('files_contributed')
+    def _summarize_files(self, key, files):
+        self.files_count = len(files or [])
+        self.files = [
+            ContributorFile(file_path=f['path'], severity=f.get('severity'), findings_count=f.get('findings_count') or 0)
+            for f in files or [] if f.get('path')
+        ]
+
+        # First file with the best-ranked severity; nothing outranks critical
+        highest, highest_rank = None, None
+        for f in files or []:
+            severity = f.get('severity')
+            if not severity:
+                continue
+            rank = self.SEVERITY_ORDER.get(severity, 99)
+            if highest_rank is None or rank < highest_rank:
+                highest, highest_rank = severity, rank
+                if rank == 0:
+                    break
+        self.highest_severity = highest
+        return files
+
+    @validates('folders_contributed')
+    def _summarize_folders(self, key, folders):
+        self.folders_count = len(folders or [])
+        return folders
+
+class ContributorFile(Base):
+    """One entry of Contributor.files_contributed, kept as a row so severities can be counted in SQL."""
+    __tablename__ = "contributor_files"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    contributor_id = Column(UUID(as_uuid=True), ForeignKey("contributors.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_path = Column(String, nullable=False)
+    severity = Column(String)
+    findings_count = Column(Integer, default=0)
 
 class LanguageStat(Base):
     __tablename__ = "language_stats"
@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, case, func
-from typing import List, Optional, Dict
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, load_only, raiseload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, delete, func, or_, select, text
+from sqlalchemy import update as sql_update  # "update" is the request body name in several handlers
+from typing import List, Literal, Optional, Dict, Tuple, get_args
+from ..database import get_db, get_async_db, SessionLocal
 from .. import models
 from pydantic import BaseModel
 from datetime import datetime
+from cachetools import TTLCache
+from string import Template
+from functools import lru_cache
+from ..config import settings
+import re
+import threading
 import uuid
 import logging
 
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -16,7 +35,8 @@ router = APIRouter(
     tags=["findings"]
 )
 
-# Severity priority for sorting (lower = higher priority)
+# Severity priority for sorting (lower = higher priority).
+# Mirrors the generated findings.severity_rank column used for ORDER BY.
 SEVERITY_PRIORITY = {
     'critical': 1,
     'high': 2,
@@ -26,6 +46,62 @@ SEVERITY_PRIORITY = {
     'warning': 6
 }
 
+# Upper bound for match counts on the exception/dry-run paths. Counting past
+# this adds latency without changing what the analyst decides to do.
+MATCH_COUNT_CAP = 10_000
+
+# Short-lived cache of built FindingResponse objects for GET /findings/{id}.
+# The detail view is polled repeatedly; entries are dropped on every write.
+_finding_cache: TTLCache = TTLCache(maxsize=4096, ttl=5)
+_finding_cache_lock = threading.Lock()
+
+# Exception-rule caches, guarded by the same lock. Generated rules only depend
+# on immutable finding fields and are keyed by (finding id as requested,
+# scope); match counts and dry-run previews move as findings are ingested or
+# deleted. Invalidation is per worker, so callers confirm the finding still
+# exists before serving a cached rule or preview, and every entry is short-lived.
+_exception_rule_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_match_count_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_dry_run_cache: TTLCache = TTLCache(maxsize=1024, ttl=10)
+
+ExceptionScope = Literal["specific", "global"]
+EXCEPTION_SCOPES = get_args(ExceptionScope)
+
+# Serialized journal entries for GET /findings/{id}/investigation, keyed by the
+# finding's primary key id. Each entry carries the journal version it was built
+# from, (latest created_at, latest updated_at, entry count), and is only reused
+# while that still matches, so writes and edits from other workers are picked
+# up on the next poll.
+_investigation_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+def _invalidate_finding_cache(*finding_ids: uuid.UUID) -> None:
+    """Drop findings from the detail and exception-rule caches by any of their UUIDs, or everything if none are given."""
+    with _finding_cache_lock:
+        if not finding_ids:
+            _finding_cache.clear()
+            _exception_rule_cache.clear()
+            _investigation_cache.clear()
+            return
+        for finding_id in finding_ids:
+            key = str(finding_id)
+            _finding_cache.pop(key, None)
+            for scope in EXCEPTION_SCOPES:
+                _exception_rule_cache.pop((key, scope), None)
+
+
+def _invalidate_investigation_cache(finding_pk: uuid.UUID) -> None:
+    """Drop a finding's cached journal entries after a journal write."""
+    with _finding_cache_lock:
+        _investigation_cache.pop(str(finding_pk), None)
+
+
+def _invalidate_match_caches() -> None:
+    """Drop cached match counts and dry-run previews after findings are deleted."""
+    with _finding_cache_lock:
+        _match_count_cache.clear()
+        _dry_run_cache.clear()
+
 class RemediationModel(BaseModel):
     id: str
     remediation_text: str
@@ -58,27 +134,19 @@ class FindingResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
-@router.get("/", response_model=List[FindingResponse])
-def get_findings(
-    skip: int = 0, 
-    limit: int = 100, 
-    severity: Optional[str] = None,
-    status: Optional[str] = None,
-    repo_name: Optional[str] = None,
-    order_by: Optional[str] = "severity",  # "severity", "created_at", "repo_name"
-    db: Session = Depends(get_db)
+def _build_findings_query(
+    db: Session,
+    severity: Optional[str],
+    status: Optional[str],
+    repo_name: Optional[str],
+    order_by: Optional[str]
 ):
-    """Get all findings with optional filtering.
-    
-    Args:
-        skip: Number of records to skip (pagination)
-        limit: Maximum number of records to return
-        severity: Filter by severity (critical, high, medium, low, info)
-        status: Filter by status (open, resolved, etc.)
-        repo_name: Filter by repository name
-        order_by: Sort order - "severity" (default), "created_at", or "repo_name"
-    """
-    query = db.query(models.Finding).join(models.Repository)
+    """Build the filtered and ordered findings query shared by the list and stream endpoints."""
+    query = db.query(models.Finding)
+
+    # Repository is only needed in the base query to filter or sort by its name
+    if repo_name or order_by == "repo_name":
+        query = query.join(models.Repository)
     
     if severity:
         query = query.filter(models.Finding.severity == severity)
@@ -91,31 +159,55 @@ def get_findings(
     
     # Order by severity priority, then by created_at
     if order_by == "severity":
-        severity_order = case(
-            (models.Finding.severity == 'critical', 1),
-            (models.Finding.severity == 'high', 2),
-            (models.Finding.severity == 'medium', 3),
-            (models.Finding.severity == 'low', 4),
-            (models.Finding.severity == 'info', 5),
-            (models.Finding.severity == 'warning', 6),
-            else_=7
-        )
-        query = query.order_by(severity_order, models.Finding.created_at.desc())
+        query = query.order_by(models.Finding.severity_rank, models.Finding.created_at.desc())
     elif order_by == "repo_name":
         query = query.order_by(models.Repository.name, models.Finding.created_at.desc())
-    else:  # created_at
-        query = query.order_by(models.Finding.created_at.desc())
-    
-    # Apply pagination - limit=0 means no limit (fetch all)
-    if skip > 0:
-        query = query.offset(skip)
-    if limit > 0:
-        query = query.limit(limit)
-        
-    findings = query.all()
-    
-    # Get file commit data for findings with file_paths (batch query)
-    file_commits_map: Dict[str, models.FileCommit] = {}
+    else:  # created_at, with id as a tiebreaker so keyset cursors are stable
+        query = query.order_by(models.Finding.created_at.desc(), models.Finding.id.desc())
+
+    return query
+
+
+# Finding columns read by _to_finding_response. Large columns the list never
+# shows (AI remediation text/diff, resolution notes, ...) are not loaded.
+_LIST_FINDING_COLUMNS = (
+    models.Finding.finding_uuid,
+    models.Finding.repository_id,
+    models.Finding.title,
+    models.Finding.description,
+    models.Finding.severity,
+    models.Finding.status,
+    models.Finding.scanner_name,
+    models.Finding.file_path,
+    models.Finding.line_start,
+    models.Finding.created_at,
+    models.Finding.investigation_status,
+    models.Finding.investigation_started_at,
+)
+
+
+def _list_load_options(include_code_snippet: bool = True) -> tuple:
+    """Loader options for the list/stream endpoints: only the columns the response uses."""
+    columns = _LIST_FINDING_COLUMNS + ((models.Finding.code_snippet,) if include_code_snippet else ())
+    return (
+        load_only(*columns, raiseload=True),
+        selectinload(models.Finding.remediations),
+        joinedload(models.Finding.repository).load_only(
+            models.Repository.name,
+            models.Repository.pushed_at,
+            models.Repository.is_archived,
+            raiseload=True
+        ),
+        raiseload("*")
+    )
+
+
+FileCommitKey = Tuple[uuid.UUID, str]
+
+
+def _load_file_commits(db: Session, findings: List[models.Finding]) -> Dict[FileCommitKey, models.FileCommit]:
+    """Get file commit data for findings with file_paths (batch query), keyed by (repository_id, file_path)."""
+    file_commits_map: Dict[FileCommitKey, models.FileCommit] = {}
     finding_file_keys = [
         (f.repository_id, f.file_path) 
         for f in findings 
@@ -127,10 +219,22 @@ def get_findings(
             models.FileCommit.repository_id.in_([k[0] for k in finding_file_keys])
         ).all()
         for fc in file_commits:
-            key = f"{fc.repository_id}:{fc.file_path}"
-            file_commits_map[key] = fc
-    
-    return [FindingResponse(
+            file_commits_map[(fc.repository_id, fc.file_path)] = fc
+    return file_commits_map
+
+
+def _to_finding_response(
+    f: models.Finding,
+    file_commits_map: Dict[FileCommitKey, models.FileCommit],
+    include_code_snippet: bool = True
+) -> FindingResponse:
+    """Build the API response for a finding loaded by the list/stream endpoints.
+
+    Values come straight from DB rows, so the models are built with
+    model_construct to skip per-field validation on this hot path.
+    """
+    fc = file_commits_map.get((f.repository_id, f.file_path)) if f.repository_id and f.file_path else None
+    return FindingResponse.model_construct(
         id=str(f.finding_uuid),
         title=f.title,
         description=f.description,
@@ -139,39 +243,197 @@ def get_findings(
         scanner_name=f.scanner_name,
         file_path=f.file_path,
         line_start=f.line_start,
-        code_snippet=f.code_snippet,
+        code_snippet=f.code_snippet if include_code_snippet else None,
         created_at=f.created_at,
         repo_pushed_at=f.repository.pushed_at if f.repository else None,
-        file_last_commit_at=file_commits_map.get(f"{f.repository_id}:{f.file_path}").last_commit_date if f.repository_id and f.file_path and f"{f.repository_id}:{f.file_path}" in file_commits_map else None,
-        file_last_commit_author=file_commits_map.get(f"{f.repository_id}:{f.file_path}").last_commit_author if f.repository_id and f.file_path and f"{f.repository_id}:{f.file_path}" in file_commits_map else None,
+        file_last_commit_at=fc.last_commit_date if fc else None,
+        file_last_commit_author=fc.last_commit_author if fc else None,
         repo_name=f.repository.name if f.repository else "Unknown",
         repository_id=str(f.repository.id) if f.repository else None,
         is_archived=f.repository.is_archived if f.repository else None,
         investigation_status=f.investigation_status,
         investigation_started_at=f.investigation_started_at,
-        remediations=[RemediationModel(
+        remediations=[RemediationModel.model_construct(
             id=str(r.id),
             remediation_text=r.remediation_text,
             diff=r.diff,
             confidence=float(r.confidence) if r.confidence else None,
             created_at=r.created_at
         ) for r in f.remediations]
-    ) for f in findings]
+    )
+
+
+@lru_cache(maxsize=4096)
+def _parse_uuid(value: str) -> uuid.UUID:
+    """Parse a UUID path/body parameter, memoized for clients that poll the same ids.
+
+    Raises ValueError for malformed input (failures are not cached).
+    """
+    return uuid.UUID(value)
+
+
+def _finding_id_match(uuid_obj: uuid.UUID):
+    """Match a finding by its public finding_uuid or its primary key id."""
+    return or_(models.Finding.finding_uuid == uuid_obj, models.Finding.id == uuid_obj)
+
+
+def _get_finding_by_any_uuid(db: Session, uuid_obj: uuid.UUID, *options) -> Optional[models.Finding]:
+    """Look up a finding by finding_uuid or primary key id in a single query."""
+    return db.query(models.Finding).options(*options).filter(_finding_id_match(uuid_obj)).first()
+
+
+def _resolve_finding_pk(db: Session, uuid_obj: uuid.UUID) -> Optional[uuid.UUID]:
+    """Resolve a finding_uuid or id to the finding's primary key without loading the row."""
+    return db.query(models.Finding.id).filter(_finding_id_match(uuid_obj)).limit(1).scalar()
+
+
+async def _resolve_finding_pk_async(db: AsyncSession, uuid_obj: uuid.UUID) -> Optional[uuid.UUID]:
+    """Async variant of _resolve_finding_pk."""
+    return (await db.execute(
+        select(models.Finding.id).where(_finding_id_match(uuid_obj)).limit(1)
+    )).scalar()
+
+
+async def _get_finding_by_any_uuid_async(db: AsyncSession, uuid_obj: uuid.UUID, *options) -> Optional[models.Finding]:
+    """Async variant of _get_finding_by_any_uuid."""
+    return (await db.execute(
+        select(models.Finding).options(*options).where(_finding_id_match(uuid_obj)).limit(1)
+    )).scalars().first()
+
+
+@router.get("/", response_model=List[FindingResponse])
+def get_findings(
+    response: Response,
+    skip: int = 0, 
+    limit: int = 100, 
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    repo_name: Optional[str] = None,
+    order_by: Optional[str] = "severity",  # "severity", "created_at", "repo_name"
+    before_created_at: Optional[datetime] = None,
+    before_id: Optional[uuid.UUID] = None,
+    include_code_snippet: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Get all findings with optional filtering.
+    
+    Args:
+        skip: Number of records to skip (pagination)
+        limit: Maximum number of records to return
+        severity: Filter by severity (critical, high, medium, low, info)
+        status: Filter by status (open, resolved, etc.)
+        repo_name: Filter by repository name
+        order_by: Sort order - "severity" (default), "created_at", or "repo_name"
+        before_created_at, before_id: Keyset cursor for order_by="created_at".
+            Returns findings strictly after this position, without the cost of
+            OFFSET on deep pages. A full page sets the X-Next-Before-Created-At
+            and X-Next-Before-Id response headers to the next cursor.
+        include_code_snippet: Set to false to leave code snippets out of the
+            list (they are always available from GET /findings/{id})
+    """
+    query = _build_findings_query(db, severity, status, repo_name, order_by).options(
+        *_list_load_options(include_code_snippet)
+    )
+
+    keyset = order_by == "created_at"
+    if before_created_at is not None or before_id is not None:
+        if not keyset or before_created_at is None or before_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="before_created_at and before_id must be given together with order_by=created_at"
+            )
+        query = query.filter(or_(
+            models.Finding.created_at < before_created_at,
+            and_(models.Finding.created_at == before_created_at, models.Finding.id < before_id)
+        ))
+    
+    # Apply pagination - limit=0 means no limit (fetch all)
+    if skip > 0:
+        query = query.offset(skip)
+    if limit > 0:
+        query = query.limit(limit)
+        
+    findings = query.all()
+    file_commits_map = _load_file_commits(db, findings)
+
+    if keyset and limit > 0 and len(findings) == limit:
+        last = findings[-1]
+        response.headers["X-Next-Before-Created-At"] = last.created_at.isoformat()
+        response.headers["X-Next-Before-Id"] = str(last.id)
+    
+    return [_to_finding_response(f, file_commits_map, include_code_snippet) for f in findings]
+
+
+# Rows fetched per round trip when streaming findings
+STREAM_BATCH_SIZE = 500
+
+
+@router.get("/stream")
+def stream_findings(
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    repo_name: Optional[str] = None,
+    order_by: Optional[str] = "severity",
+    include_code_snippet: bool = True
+):
+    """Stream all matching findings as newline-delimited JSON.
+
+    Same filters and ordering as GET /findings/, but rows are fetched in
+    batches of STREAM_BATCH_SIZE so memory stays flat for full exports.
+    """
+    def generate():
+        # The response outlives the request dependencies, so the generator
+        # owns its session for the duration of the stream.
+        db = SessionLocal()
+        try:
+            query = _build_findings_query(db, severity, status, repo_name, order_by).options(
+                *_list_load_options(include_code_snippet)
+            )
+            batch: List[models.Finding] = []
+            for f in query.yield_per(STREAM_BATCH_SIZE):
+                batch.append(f)
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    yield from _serialize_batch(db, batch, include_code_snippet)
+                    batch = []
+            if batch:
+                yield from _serialize_batch(db, batch, include_code_snippet)
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def _serialize_batch(db: Session, findings: List[models.Finding], include_code_snippet: bool = True):
+    """Yield NDJSON lines for a batch of findings."""
+    file_commits_map = _load_file_commits(db, findings)
+    for f in findings:
+        yield _to_finding_response(f, file_commits_map, include_code_snippet).model_dump_json() + "\n"
 
 @router.get("/{finding_id}", response_model=FindingResponse)
 def get_finding(finding_id: str, db: Session = Depends(get_db)):
     """Get a specific finding by UUID."""
     # Try to parse UUID
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        # Fallback to check primary key id if finding_uuid fails (though model uses finding_uuid for public access usually)
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
+    cache_key = str(uuid_obj)
+    with _finding_cache_lock:
+        cached = _finding_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Remediations and repository are both used in the response, so load them
+    # up front; any other relationship access raises instead of lazy loading
+    finding = _get_finding_by_any_uuid(
+        db,
+        uuid_obj,
+        selectinload(models.Finding.remediations),
+        joinedload(models.Finding.repository),
+        raiseload("*")
+    )
+
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
@@ -183,7 +445,7 @@ def get_finding(finding_id: str, db: Session = Depends(get_db)):
             models.FileCommit.file_path == finding.file_path
         ).first()
 
-    return FindingResponse(
+    response = FindingResponse(
         id=str(finding.finding_uuid),
         title=finding.title,
         description=finding.description,
@@ -211,6 +473,10 @@ def get_finding(finding_id: str, db: Session = Depends(get_db)):
         ) for r in finding.remediations]
     )
 
+    with _finding_cache_lock:
+        _finding_cache[cache_key] = response
+    return response
+
 
 # =============================================================================
 # Finding Update Models and Endpoints
@@ -229,27 +495,24 @@ class FindingUpdateResponse(BaseModel):
 
 
 @router.patch("/{finding_id}", response_model=FindingUpdateResponse)
-def update_finding(finding_id: str, update: FindingUpdateRequest, db: Session = Depends(get_db)):
+async def update_finding(finding_id: str, update: FindingUpdateRequest, db: AsyncSession = Depends(get_async_db)):
     """Update a specific finding by UUID. Saves previous description to version history."""
     # Try to parse UUID
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        # Fallback to check primary key id
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
+    finding = await _get_finding_by_any_uuid_async(db, uuid_obj)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
     updated_fields = []
     version_id = None
+    public_id = str(finding.finding_uuid)
     
-    # Update description if provided
-    if update.description is not None:
+    # Update description if provided and actually different
+    if update.description is not None and update.description != finding.description:
         old_description = finding.description
         
         # Save old description to version history if it exists
@@ -263,19 +526,19 @@ def update_finding(finding_id: str, update: FindingUpdateRequest, db: Session =
                 change_metadata={"source": "ai_analysis", "timestamp": datetime.utcnow().isoformat()}
             )
             db.add(history_entry)
-            db.flush()  # Get the ID
+            await db.flush()  # Get the ID
             version_id = str(history_entry.id)
         
         finding.description = update.description
         updated_fields.append("description")
     
     if updated_fields:
-        db.commit()
-        db.refresh(finding)
+        await db.commit()
+        _invalidate_finding_cache(finding.finding_uuid, finding.id)
         logger.info(f"Updated finding {finding_id}: {updated_fields}")
     
     return FindingUpdateResponse(
-        id=str(finding.finding_uuid),
+        id=public_id,
         message=f"Successfully updated finding" if updated_fields else "No fields to update",
         updated_fields=updated_fields,
         version_id=version_id
@@ -304,14 +567,11 @@ class DescriptionVersionListResponse(BaseModel):
 def get_description_versions(finding_id: str, db: Session = Depends(get_db)):
     """Get all description versions for a finding."""
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
+    finding = _get_finding_by_any_uuid(db, uuid_obj)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
@@ -344,27 +604,26 @@ class RestoreVersionRequest(BaseModel):
 
 
 @router.post("/{finding_id}/restore-description", response_model=FindingUpdateResponse)
-def restore_description_version(finding_id: str, request: RestoreVersionRequest, db: Session = Depends(get_db)):
+async def restore_description_version(finding_id: str, request: RestoreVersionRequest, db: AsyncSession = Depends(get_async_db)):
     """Restore a previous description version."""
     try:
-        finding_uuid = uuid.UUID(finding_id)
-        version_uuid = uuid.UUID(request.version_id)
+        finding_uuid = _parse_uuid(finding_id)
+        version_uuid = _parse_uuid(request.version_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == finding_uuid).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == finding_uuid).first()
-        
+    finding = await _get_finding_by_any_uuid_async(db, finding_uuid)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
     # Get the version to restore
-    version = db.query(models.FindingHistory).filter(
-        models.FindingHistory.id == version_uuid,
-        models.FindingHistory.finding_id == finding.id,
-        models.FindingHistory.change_type == "description"
-    ).first()
+    version = (await db.execute(
+        select(models.FindingHistory).where(
+            models.FindingHistory.id == version_uuid,
+            models.FindingHistory.finding_id == finding.id,
+            models.FindingHistory.change_type == "description"
+        )
+    )).scalars().first()
 
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
@@ -384,8 +643,8 @@ def restore_description_version(finding_id: str, request: RestoreVersionRequest,
 
     # Restore the old description
     finding.description = version.old_value
-    db.commit()
-    db.refresh(finding)
+    await db.commit()
+    _invalidate_finding_cache(finding.finding_uuid, finding.id)
     
     logger.info(f"Restored description for finding {finding_id} from version {request.version_id}")
 
@@ -404,7 +663,7 @@ def restore_description_version(finding_id: str, request: RestoreVersionRequest,
 class ExceptionRuleRequest(BaseModel):
     """Request to generate an exception rule for a finding."""
     finding_id: str
-    scope: str  # "specific" or "global"
+    scope: ExceptionScope
     reason: Optional[str] = None  # Optional reason for the exception
 
 class ExceptionRuleResponse(BaseModel):
@@ -414,15 +673,17 @@ class ExceptionRuleResponse(BaseModel):
     rule_content: str  # The actual rule (TOML, regex, etc.)
     instruction: str  # Where to apply this rule
     affected_count: int  # How many findings match this rule
+    affected_count_is_capped: bool = False  # True when affected_count stopped at MATCH_COUNT_CAP
 
 class DeleteDryRunRequest(BaseModel):
     """Request for dry-run deletion analysis."""
     finding_id: str
-    scope: str  # "specific" or "global"
+    scope: ExceptionScope
 
 class DeleteDryRunResponse(BaseModel):
     """Response showing what would be deleted."""
     count: int
+    count_is_capped: bool = False  # True when count stopped at MATCH_COUNT_CAP
     scanner_name: str
     file_path: Optional[str]
     sample_findings: List[dict]  # Sample of findings that would be deleted
@@ -430,7 +691,7 @@ class DeleteDryRunResponse(BaseModel):
 class DeleteFindingsRequest(BaseModel):
     """Request to delete findings."""
     finding_id: str
-    scope: str  # "specific" or "global"
+    scope: ExceptionScope
     confirmed: bool = False  # Must be True to actually delete
 
 class DeleteFindingsResponse(BaseModel):
@@ -443,6 +704,76 @@ class DeleteFindingsResponse(BaseModel):
 # Exception Rule Generation
 # =============================================================================
 
+async def _capped_count(db: AsyncSession, *criteria, cap: int = MATCH_COUNT_CAP) -> Tuple[int, bool]:
+    """Count the findings matching criteria, stopping once cap is exceeded.
+
+    Returns (count, is_capped).
+    """
+    bounded = select(models.Finding.id).where(*criteria).limit(cap + 1).subquery()
+    count = (await db.execute(select(func.count()).select_from(bounded))).scalar() or 0
+    return min(count, cap), count > cap
+
+
+# Rule templates are parsed once at import. Values placed inside quoted
+# TOML/YAML strings go through _quote_value so titles, paths or secrets
+# containing quotes or backslashes can't break out of the string.
+_GITLEAKS_SPECIFIC_TPL = Template('''[[rules.allowlist]]
+description = "Exception for $title"
+regexTarget = "match"
+regexes = [
+    "$regex"
+]
+paths = [
+    "$path"
+]''')
+
+_GITLEAKS_GLOBAL_TPL = Template('''[[rules.allowlist]]
+description = "Global exception for $path"
+paths = [
+    "$path"
+]''')
+
+_TRUFFLEHOG_SPECIFIC_TPL = Template('''# Exception for $title
+exclude:
+  paths:
+    - "$path"
+  detectors:
+    - "$detector"''')
+
+_TRUFFLEHOG_GLOBAL_TPL = Template('''# Global exception for path
+exclude:
+  paths:
+    - "$path"''')
+
+_SEMGREP_SPECIFIC_TPL = Template('''# Add this comment to the specific line in $path:
+# nosemgrep: $rule_id
+
+# Or add to .semgrepignore:
+$path:$line''')
+
+_SEMGREP_GLOBAL_TPL = Template('''# Add to .semgrepignore file:
+$path''')
+
+_GENERIC_SPECIFIC_TPL = Template('''# Exception for specific finding
+# Scanner: $scanner
+# File: $path
+# Line: $line
+# Title: $title
+
+# Add to your scanner's ignore/allowlist configuration''')
+
+_GENERIC_GLOBAL_TPL = Template('''# Global exception for path
+# Scanner: $scanner
+# File: $path
+
+# Add to your scanner's ignore/allowlist configuration''')
+
+
+def _quote_value(value: Optional[str]) -> str:
+    """Escape a value for a double-quoted TOML/YAML string."""
+    return (value or "").replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
 def generate_gitleaks_rule(finding: models.Finding, scope: str) -> dict:
     """Generate a Gitleaks allowlist rule."""
     if scope == "specific":
@@ -450,26 +781,18 @@ def generate_gitleaks_rule(finding: models.Finding, scope: str) -> dict:
         secret_value = finding.code_snippet or ""
         # Truncate and escape the secret for regex
         if len(secret_value) > 50:
-            regex_pattern = f"{secret_value[:50]}.*"
+            regex_pattern = f"{re.escape(secret_value[:50])}.*"
         else:
-            regex_pattern = f".*{secret_value}.*"
+            regex_pattern = f".*{re.escape(secret_value)}.*"
 
-        rule_content = f'''[[rules.allowlist]]
-description = "Exception for {finding.title}"
-regexTarget = "match"
-regexes = [
-    "{regex_pattern}"
-]
-paths = [
-    "{finding.file_path}"
-]'''
+        rule_content = _GITLEAKS_SPECIFIC_TPL.substitute(
+            title=_quote_value(finding.title),
+            regex=_quote_value(regex_pattern),
+            path=_quote_value(finding.file_path)
+        )
     else:
         # Global rule - match file path
-        rule_content = f'''[[rules.allowlist]]
-description = "Global exception for {finding.file_path}"
-paths = [
-    "{finding.file_path}"
-]'''
+        rule_content = _GITLEAKS_GLOBAL_TPL.substitute(path=_quote_value(finding.file_path))
 
     return {
         "rule_type": "allowlist",
@@ -481,17 +804,13 @@ paths = [
 def generate_trufflehog_rule(finding: models.Finding, scope: str) -> dict:
     """Generate a TruffleHog exclusion rule."""
     if scope == "specific":
-        rule_content = f'''# Exception for {finding.title}
-exclude:
-  paths:
-    - "{finding.file_path}"
-  detectors:
-    - "{finding.finding_type or 'generic'}"'''
+        rule_content = _TRUFFLEHOG_SPECIFIC_TPL.substitute(
+            title=finding.title,
+            path=_quote_value(finding.file_path),
+            detector=_quote_value(finding.finding_type or 'generic')
+        )
     else:
-        rule_content = f'''# Global exception for path
-exclude:
-  paths:
-    - "{finding.file_path}"'''
+        rule_content = _TRUFFLEHOG_GLOBAL_TPL.substitute(path=_quote_value(finding.file_path))
 
     return {
         "rule_type": "exclude",
@@ -503,14 +822,13 @@ exclude:
 def generate_semgrep_rule(finding: models.Finding, scope: str) -> dict:
     """Generate a Semgrep nosemgrep comment or ignore rule."""
     if scope == "specific":
-        rule_content = f'''# Add this comment to the specific line in {finding.file_path}:
-# nosemgrep: {finding.finding_type or 'rule-id'}
-
-# Or add to .semgrepignore:
-{finding.file_path}:{finding.line_start or 1}'''
+        rule_content = _SEMGREP_SPECIFIC_TPL.substitute(
+            path=finding.file_path,
+            rule_id=finding.finding_type or 'rule-id',
+            line=finding.line_start or 1
+        )
     else:
-        rule_content = f'''# Add to .semgrepignore file:
-{finding.file_path}'''
+        rule_content = _SEMGREP_GLOBAL_TPL.substitute(path=finding.file_path)
 
     return {
         "rule_type": "ignore",
@@ -522,19 +840,17 @@ def generate_semgrep_rule(finding: models.Finding, scope: str) -> dict:
 def generate_generic_rule(finding: models.Finding, scope: str) -> dict:
     """Generate a generic exception rule for unknown scanners."""
     if scope == "specific":
-        rule_content = f'''# Exception for specific finding
-# Scanner: {finding.scanner_name}
-# File: {finding.file_path}
-# Line: {finding.line_start or 'N/A'}
-# Title: {finding.title}
-
-# Add to your scanner's ignore/allowlist configuration'''
+        rule_content = _GENERIC_SPECIFIC_TPL.substitute(
+            scanner=finding.scanner_name,
+            path=finding.file_path,
+            line=finding.line_start or 'N/A',
+            title=finding.title
+        )
     else:
-        rule_content = f'''# Global exception for path
-# Scanner: {finding.scanner_name}
-# File: {finding.file_path}
-
-# Add to your scanner's ignore/allowlist configuration'''
+        rule_content = _GENERIC_GLOBAL_TPL.substitute(
+            scanner=finding.scanner_name,
+            path=finding.file_path
+        )
 
     return {
         "rule_type": "ignore",
@@ -544,58 +860,76 @@ def generate_generic_rule(finding: models.Finding, scope: str) -> dict:
 
 
 @router.post("/exception/generate", response_model=ExceptionRuleResponse)
-def generate_exception_rule(
+async def generate_exception_rule(
     request: ExceptionRuleRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate an exception rule for a finding based on its scanner type."""
     # Get the finding
     try:
-        uuid_obj = uuid.UUID(request.finding_id)
+        uuid_obj = _parse_uuid(request.finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
+    cache_key = (str(uuid_obj), request.scope)
+    with _finding_cache_lock:
+        cached = _exception_rule_cache.get(cache_key)
 
-    if not finding:
+    # The finding may have been deleted through another worker since caching
+    if cached is not None and await _resolve_finding_pk_async(db, uuid_obj) is None:
         raise HTTPException(status_code=404, detail="Finding not found")
 
-    # Validate scope
-    if request.scope not in ["specific", "global"]:
-        raise HTTPException(status_code=400, detail="Scope must be 'specific' or 'global'")
-
-    scanner_name = (finding.scanner_name or "").lower()
-
-    # Generate rule based on scanner type
-    if "gitleaks" in scanner_name:
-        rule_data = generate_gitleaks_rule(finding, request.scope)
-    elif "trufflehog" in scanner_name:
-        rule_data = generate_trufflehog_rule(finding, request.scope)
-    elif "semgrep" in scanner_name:
-        rule_data = generate_semgrep_rule(finding, request.scope)
+    if cached is not None:
+        finding_scanner_name, finding_file_path, rule_data = cached
     else:
-        rule_data = generate_generic_rule(finding, request.scope)
+        finding = await _get_finding_by_any_uuid_async(db, uuid_obj)
+        if not finding:
+            raise HTTPException(status_code=404, detail="Finding not found")
+
+        scanner_name = (finding.scanner_name or "").lower()
+
+        # Generate rule based on scanner type
+        if "gitleaks" in scanner_name:
+            rule_data = generate_gitleaks_rule(finding, request.scope)
+        elif "trufflehog" in scanner_name:
+            rule_data = generate_trufflehog_rule(finding, request.scope)
+        elif "semgrep" in scanner_name:
+            rule_data = generate_semgrep_rule(finding, request.scope)
+        else:
+            rule_data = generate_generic_rule(finding, request.scope)
+
+        finding_scanner_name = finding.scanner_name
+        finding_file_path = finding.file_path
+        with _finding_cache_lock:
+            _exception_rule_cache[cache_key] = (finding_scanner_name, finding_file_path, rule_data)
 
     # Count affected findings
+    affected_count_is_capped = False
     if request.scope == "specific":
         affected_count = 1
     else:
         # Count all findings with same scanner and file path
-        affected_count = db.query(models.Finding).filter(
-            and_(
-                models.Finding.scanner_name == finding.scanner_name,
-                models.Finding.file_path == finding.file_path
+        count_key = (finding_scanner_name, finding_file_path)
+        with _finding_cache_lock:
+            cached_count = _match_count_cache.get(count_key)
+        if cached_count is not None:
+            affected_count, affected_count_is_capped = cached_count
+        else:
+            affected_count, affected_count_is_capped = await _capped_count(
+                db,
+                models.Finding.scanner_name == finding_scanner_name,
+                models.Finding.file_path == finding_file_path
             )
-        ).count()
+            with _finding_cache_lock:
+                _match_count_cache[count_key] = (affected_count, affected_count_is_capped)
 
     return ExceptionRuleResponse(
-        scanner_name=finding.scanner_name or "Unknown",
+        scanner_name=finding_scanner_name or "Unknown",
         rule_type=rule_data["rule_type"],
         rule_content=rule_data["rule_content"],
         instruction=rule_data["instruction"],
-        affected_count=affected_count
+        affected_count=affected_count,
+        affected_count_is_capped=affected_count_is_capped
     )
 
 
@@ -604,9 +938,9 @@ def generate_exception_rule(
 # =============================================================================
 
 @router.post("/exception/delete/dry-run", response_model=DeleteDryRunResponse)
-def delete_findings_dry_run(
+async def delete_findings_dry_run(
     request: DeleteDryRunRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Perform a dry-run analysis to show how many findings would be deleted.
@@ -614,21 +948,25 @@ def delete_findings_dry_run(
     """
     # Get the finding
     try:
-        uuid_obj = uuid.UUID(request.finding_id)
+        uuid_obj = _parse_uuid(request.finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-
+    # Analysts often re-open the delete dialog; reuse a very recent preview
+    cache_key = (str(uuid_obj), request.scope)
+    with _finding_cache_lock:
+        cached = _dry_run_cache.get(cache_key)
+    if cached is not None:
+        # The finding may have been deleted through another worker since caching
+        if await _resolve_finding_pk_async(db, uuid_obj) is None:
+            raise HTTPException(status_code=404, detail="Finding not found")
+        return cached
+
+    finding = await _get_finding_by_any_uuid_async(db, uuid_obj)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
-    # Validate scope
-    if request.scope not in ["specific", "global"]:
-        raise HTTPException(status_code=400, detail="Scope must be 'specific' or 'global'")
-
+    count_is_capped = False
     if request.scope == "specific":
         # Only this specific finding
         count = 1
@@ -639,17 +977,28 @@ def delete_findings_dry_run(
             "scanner_name": finding.scanner_name
         }]
     else:
-        # Global scope - match scanner AND file path for safety
-        query = db.query(models.Finding).filter(
-            and_(
-                models.Finding.scanner_name == finding.scanner_name,
-                models.Finding.file_path == finding.file_path
-            )
+        # Global scope - match scanner AND file path for safety.
+        # Only the columns shown in the sample are selected (plain rows, no ORM entities)
+        match = (
+            models.Finding.scanner_name == finding.scanner_name,
+            models.Finding.file_path == finding.file_path
         )
-        count = query.count()
+        # Get a sample of findings (up to 5) and the capped match count in one
+        # statement: the window count runs over at most MATCH_COUNT_CAP + 1
+        # matches before the outer LIMIT trims the rows down to the sample
+        matches = select(
+            models.Finding.finding_uuid,
+            models.Finding.title,
+            models.Finding.file_path,
+            models.Finding.scanner_name
+        ).where(*match).limit(MATCH_COUNT_CAP + 1).subquery()
+        sample = (await db.execute(
+            select(matches, func.count().over().label("total")).limit(5)
+        )).all()
+        total = sample[0].total if sample else 0
+        count_is_capped = total > MATCH_COUNT_CAP
+        count = min(total, MATCH_COUNT_CAP)
 
-        # Get sample of findings (up to 5)
-        sample = query.limit(5).all()
         sample_findings = [{
             "id": str(f.finding_uuid),
             "title": f.title,
@@ -657,18 +1006,40 @@ def delete_findings_dry_run(
             "scanner_name": f.scanner_name
         } for f in sample]
 
-    return DeleteDryRunResponse(
+    response = DeleteDryRunResponse(
         count=count,
+        count_is_capped=count_is_capped,
         scanner_name=finding.scanner_name or "Unknown",
         file_path=finding.file_path,
         sample_findings=sample_findings
     )
+    with _finding_cache_lock:
+        _dry_run_cache[cache_key] = response
+    return response
+
+
+# Deletes a finding and everything referencing it in one statement. The FKs
+# have no ON DELETE action (journal_entries may, depending on how the table
+# was created), so each table is handled explicitly: remediations and journal
+# entries go with the finding, while history and comments are kept with their
+# finding_id cleared, as the ORM cascade used to do.
+_DELETE_FINDING_WITH_DEPENDENTS = text(
+    "WITH deleted_remediations AS ("
+    "DELETE FROM remediations WHERE finding_id = :fid RETURNING 1"
+    "), deleted_journal AS ("
+    "DELETE FROM journal_entries WHERE finding_id = :fid RETURNING 1"
+    "), detached_history AS ("
+    "UPDATE finding_history SET finding_id = NULL WHERE finding_id = :fid RETURNING 1"
+    "), detached_comments AS ("
+    "UPDATE finding_comments SET finding_id = NULL WHERE finding_id = :fid RETURNING 1"
+    ") DELETE FROM findings WHERE id = :fid"
+)
 
 
 @router.post("/exception/delete", response_model=DeleteFindingsResponse)
-def delete_findings(
+async def delete_findings(
     request: DeleteFindingsRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete findings based on scope. Requires confirmed=True for safety.
@@ -684,53 +1055,58 @@ def delete_findings(
 
     # Get the finding
     try:
-        uuid_obj = uuid.UUID(request.finding_id)
+        uuid_obj = _parse_uuid(request.finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-
+    finding = await _get_finding_by_any_uuid_async(db, uuid_obj)
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
-    # Validate scope
-    if request.scope not in ["specific", "global"]:
-        raise HTTPException(status_code=400, detail="Scope must be 'specific' or 'global'")
-
     try:
         if request.scope == "specific":
-            # Delete only this specific finding
-            # First delete related remediations
-            db.query(models.Remediation).filter(models.Remediation.finding_id == finding.id).delete()
-            db.delete(finding)
+            # Delete only this specific finding together with its remediations
+            # in a single statement (one round trip)
+            await db.execute(_DELETE_FINDING_WITH_DEPENDENTS, {"fid": finding.id})
             deleted_count = 1
         else:
             # Global scope - match scanner AND file path for safety
-            # Get all matching findings
-            matching_findings = db.query(models.Finding).filter(
-                and_(
-                    models.Finding.scanner_name == finding.scanner_name,
-                    models.Finding.file_path == finding.file_path
-                )
-            ).all()
-
-            deleted_count = len(matching_findings)
-
-            # Delete remediations for all matching findings
-            for f in matching_findings:
-                db.query(models.Remediation).filter(models.Remediation.finding_id == f.id).delete()
+            match = and_(
+                models.Finding.scanner_name == finding.scanner_name,
+                models.Finding.file_path == finding.file_path
+            )
 
-            # Delete the findings
-            db.query(models.Finding).filter(
-                and_(
-                    models.Finding.scanner_name == finding.scanner_name,
-                    models.Finding.file_path == finding.file_path
+            # Clear everything referencing the matching findings (as in
+            # _DELETE_FINDING_WITH_DEPENDENTS), then delete the findings
+            # themselves: set-based statements run entirely server-side
+            matching_ids = select(models.Finding.id).where(match)
+            for dependent in (models.Remediation, models.JournalEntry):
+                await db.execute(
+                    delete(dependent)
+                    .where(dependent.finding_id.in_(matching_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            for dependent in (models.FindingHistory, models.FindingComment):
+                await db.execute(
+                    sql_update(dependent)
+                    .where(dependent.finding_id.in_(matching_ids))
+                    .values(finding_id=None)
+                    .execution_options(synchronize_session=False)
                 )
-            ).delete()
+            result = await db.execute(
+                delete(models.Finding)
+                .where(match)
+                .execution_options(synchronize_session=False)
+            )
+            deleted_count = result.rowcount
 
-        db.commit()
+        await db.commit()
+        # Global deletes remove findings we never loaded, so drop the whole cache
+        if request.scope == "specific":
+            _invalidate_finding_cache(finding.finding_uuid, finding.id)
+        else:
+            _invalidate_finding_cache()
+        _invalidate_match_caches()
         logger.info(f"Deleted {deleted_count} finding(s) with scope '{request.scope}'")
 
         return DeleteFindingsResponse(
@@ -739,7 +1115,7 @@ def delete_findings(
         )
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting findings: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete findings: {str(e)}")
 
@@ -750,7 +1126,7 @@ def delete_findings(
 
 class InvestigationStatusUpdate(BaseModel):
     """Request to update investigation status."""
-    status: str  # 'triage', 'incident_response', 'resolved', or null to clear
+    status: Optional[Literal['triage', 'incident_response', 'resolved', '']] = None  # null or '' clears
 
 class JournalEntryRequest(BaseModel):
     """Request to create a journal entry."""
@@ -788,7 +1164,7 @@ class AskJournalAIRequest(BaseModel):
 class JournalEntryUpdateRequest(BaseModel):
     """Request to update a journal entry."""
     entry_text: Optional[str] = None
-    entry_type: Optional[str] = None  # 'note', 'status_change', 'ai_response', 'communication'
+    entry_type: Optional[Literal['note', 'status_change', 'ai_response', 'communication']] = None
     author_name: Optional[str] = None
 
 
@@ -796,28 +1172,43 @@ class JournalEntryUpdateRequest(BaseModel):
 def get_investigation_status(finding_id: str, db: Session = Depends(get_db)):
     """Get investigation status and journal entries for a finding."""
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
-    if not finding:
+    # Fetch the finding together with its journal version (latest entry and
+    # edit timestamps and entry count) so cached journal entries can be
+    # validated without reading the journal itself
+    journal_latest = select(func.max(models.JournalEntry.created_at)).where(
+        models.JournalEntry.finding_id == models.Finding.id
+    ).correlate(models.Finding).scalar_subquery()
+    journal_edited = select(func.max(models.JournalEntry.updated_at)).where(
+        models.JournalEntry.finding_id == models.Finding.id
+    ).correlate(models.Finding).scalar_subquery()
+    journal_count = select(func.count(models.JournalEntry.id)).where(
+        models.JournalEntry.finding_id == models.Finding.id
+    ).correlate(models.Finding).scalar_subquery()
+    row = db.query(models.Finding, journal_latest, journal_edited, journal_count).options(
+        raiseload("*")
+    ).filter(_finding_id_match(uuid_obj)).first()
+
+    if not row:
         raise HTTPException(status_code=404, detail="Finding not found")
+    finding, latest_entry_at, latest_edit_at, entry_count = row
+
+    cache_key = str(finding.id)
+    version = (latest_entry_at, latest_edit_at, entry_count)
+    with _finding_cache_lock:
+        cached = _investigation_cache.get(cache_key)
+    if cached is not None and cached[0] == version:
+        journal_responses = cached[1]
+    else:
+        # Get journal entries
+        journal_entries = db.query(models.JournalEntry).filter(
+            models.JournalEntry.finding_id == finding.id
+        ).order_by(models.JournalEntry.created_at.desc()).all()
 
-    # Get journal entries
-    journal_entries = db.query(models.JournalEntry).filter(
-        models.JournalEntry.finding_id == finding.id
-    ).order_by(models.JournalEntry.created_at.desc()).all()
-
-    return InvestigationStatusResponse(
-        finding_id=str(finding.finding_uuid),
-        investigation_status=finding.investigation_status,
-        investigation_started_at=finding.investigation_started_at,
-        investigation_resolved_at=finding.investigation_resolved_at,
-        journal_entries=[JournalEntryResponse(
+        journal_responses = [JournalEntryResponse(
             id=str(entry.id),
             entry_text=entry.entry_text,
             entry_type=entry.entry_type or 'note',
@@ -826,6 +1217,15 @@ def get_investigation_status(finding_id: str, db: Session = Depends(get_db)):
             ai_prompt=entry.ai_prompt,
             created_at=entry.created_at
         ) for entry in journal_entries]
+        with _finding_cache_lock:
+            _investigation_cache[cache_key] = (version, journal_responses)
+
+    return InvestigationStatusResponse(
+        finding_id=str(finding.finding_uuid),
+        investigation_status=finding.investigation_status,
+        investigation_started_at=finding.investigation_started_at,
+        investigation_resolved_at=finding.investigation_resolved_at,
+        journal_entries=journal_responses
     )
 
 
@@ -833,42 +1233,63 @@ def get_investigation_status(finding_id: str, db: Session = Depends(get_db)):
 def update_investigation_status(finding_id: str, update: InvestigationStatusUpdate, db: Session = Depends(get_db)):
     """Update investigation status for a finding."""
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
-    if not finding:
-        raise HTTPException(status_code=404, detail="Finding not found")
+    new_status = update.status if update.status else None
+    now = datetime.utcnow()
 
-    # Validate status
-    valid_statuses = ['triage', 'incident_response', 'resolved', None, '']
-    if update.status and update.status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: triage, incident_response, resolved")
+    # Lock the current row and keep its old status; the UPDATE below joins
+    # against it so the timestamps can depend on the old status and the
+    # old status can come back in RETURNING
+    current = select(
+        models.Finding.id,
+        models.Finding.investigation_status.label("old_status")
+    ).where(_finding_id_match(uuid_obj)).limit(1).with_for_update().cte("current")
+    old_status = current.c.old_status
 
-    old_status = finding.investigation_status
-    new_status = update.status if update.status else None
+    values = {"investigation_status": new_status}
 
     # Update timestamps based on status changes
-    if new_status and not old_status:
+    if new_status:
         # Starting investigation
-        finding.investigation_started_at = datetime.utcnow()
-    
-    if new_status == 'resolved' and old_status != 'resolved':
-        finding.investigation_resolved_at = datetime.utcnow()
-    elif new_status != 'resolved':
-        finding.investigation_resolved_at = None
+        values["investigation_started_at"] = case(
+            (or_(old_status.is_(None), old_status == ''), now),
+            else_=models.Finding.investigation_started_at
+        )
+
+    if new_status == 'resolved':
+        values["investigation_resolved_at"] = case(
+            (old_status.is_distinct_from('resolved'), now),
+            else_=models.Finding.investigation_resolved_at
+        )
+    else:
+        values["investigation_resolved_at"] = None
+
+    row = db.execute(
+        sql_update(models.Finding)
+        .where(models.Finding.id == current.c.id)
+        .values(**values)
+        .returning(
+            models.Finding.id,
+            models.Finding.finding_uuid,
+            models.Finding.investigation_status,
+            models.Finding.investigation_started_at,
+            models.Finding.investigation_resolved_at,
+            old_status
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Finding not found")
 
-    finding.investigation_status = new_status
-    
     # Create a status change journal entry
-    if old_status != new_status:
+    if row.old_status != new_status:
         status_entry = models.JournalEntry(
-            finding_id=finding.id,
-            entry_text=f"Status changed from **{old_status or 'None'}** to **{new_status or 'None'}**",
+            finding_id=row.id,
+            entry_text=f"Status changed from **{row.old_status or 'None'}** to **{new_status or 'None'}**",
             entry_type='status_change',
             author_name='System',
             is_ai_generated=False
@@ -876,13 +1297,14 @@ def update_investigation_status(finding_id: str, update: InvestigationStatusUpda
         db.add(status_entry)
 
     db.commit()
-    db.refresh(finding)
+    _invalidate_finding_cache(row.finding_uuid, row.id)
+    _invalidate_investigation_cache(row.id)
 
     return {
-        "finding_id": str(finding.finding_uuid),
-        "investigation_status": finding.investigation_status,
-        "investigation_started_at": finding.investigation_started_at,
-        "investigation_resolved_at": finding.investigation_resolved_at,
+        "finding_id": str(row.finding_uuid),
+        "investigation_status": row.investigation_status,
+        "investigation_started_at": row.investigation_started_at,
+        "investigation_resolved_at": row.investigation_resolved_at,
         "message": f"Status updated to {new_status or 'None'}"
     }
 
@@ -891,19 +1313,16 @@ def update_investigation_status(finding_id: str, update: InvestigationStatusUpda
 def create_journal_entry(finding_id: str, entry: JournalEntryRequest, db: Session = Depends(get_db)):
     """Create a new journal entry for a finding."""
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
-    if not finding:
+    finding_pk = _resolve_finding_pk(db, uuid_obj)
+    if not finding_pk:
         raise HTTPException(status_code=404, detail="Finding not found")
 
     journal_entry = models.JournalEntry(
-        finding_id=finding.id,
+        finding_id=finding_pk,
         entry_text=entry.entry_text,
         entry_type=entry.entry_type or 'note',
         author_name=entry.author_name or 'Analyst',
@@ -913,6 +1332,7 @@ def create_journal_entry(finding_id: str, entry: JournalEntryRequest, db: Sessio
     db.add(journal_entry)
     db.commit()
     db.refresh(journal_entry)
+    _invalidate_investigation_cache(finding_pk)
 
     return JournalEntryResponse(
         id=str(journal_entry.id),
@@ -925,57 +1345,88 @@ def create_journal_entry(finding_id: str, entry: JournalEntryRequest, db: Sessio
     )
 
 
+_SYSTEM_PROMPT_TEMPLATE = """You are a security analyst assistant helping investigate a security finding.
+
+**Finding Information:**
+- Title: {title}
+- Severity: {severity}
+- Scanner: {scanner_name}
+- File: {file_path}
+- Description: {description}
+- Code Snippet: {code_snippet}
+
+**Recent Journal Entries:**
+{journal_context}
+
+Please provide helpful, actionable advice for the analyst's question. Be concise but thorough."""
+
+
+# AI clients own an HTTP connection pool, so build one per API key and reuse it.
+# The async clients let the event loop serve other requests during LLM latency.
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key: str):
+    return openai.AsyncOpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=4)
+def _get_anthropic_client(api_key: str):
+    return anthropic.AsyncAnthropic(api_key=api_key)
+
+
 @router.post("/{finding_id}/journal/ask-ai", response_model=JournalEntryResponse)
-async def ask_journal_ai(finding_id: str, request: AskJournalAIRequest, db: Session = Depends(get_db)):
+async def ask_journal_ai(finding_id: str, request: AskJournalAIRequest, db: AsyncSession = Depends(get_async_db)):
     """Ask AI a question in the context of the journal and get an AI response."""
-    from ..config import settings
-    
     try:
-        uuid_obj = uuid.UUID(finding_id)
+        uuid_obj = _parse_uuid(finding_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == uuid_obj).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == uuid_obj).first()
-        
+    # Only scalar columns are read; fail fast on any relationship lazy load
+    finding = await _get_finding_by_any_uuid_async(db, uuid_obj, raiseload("*"))
+
     if not finding:
         raise HTTPException(status_code=404, detail="Finding not found")
 
-    # Get recent journal entries for context
-    recent_entries = db.query(models.JournalEntry).filter(
+    # Get the 10 most recent journal entries for context, oldest first, with
+    # only the columns the prompt uses
+    latest_entries = select(
+        models.JournalEntry.created_at,
+        models.JournalEntry.author_name,
+        models.JournalEntry.entry_text
+    ).where(
         models.JournalEntry.finding_id == finding.id
-    ).order_by(models.JournalEntry.created_at.desc()).limit(10).all()
+    ).order_by(models.JournalEntry.created_at.desc()).limit(10).subquery()
+    recent_entries = (await db.execute(
+        select(latest_entries).order_by(latest_entries.c.created_at)
+    )).all()
+
+    # End the read transaction so no pooled connection is held while waiting
+    # on the AI provider (objects stay loaded: expire_on_commit is off)
+    await db.commit()
 
     # Build context for AI
-    journal_context = "\n".join([
-        f"[{e.created_at.strftime('%Y-%m-%d %H:%M')}] {e.author_name}: {e.entry_text}"
-        for e in reversed(recent_entries)
-    ])
+    journal_context = "\n".join(
+        f"[{e.created_at:%Y-%m-%d %H:%M}] {e.author_name}: {e.entry_text}"
+        for e in recent_entries
+    )
 
     # Prepare the AI prompt
-    system_prompt = f"""You are a security analyst assistant helping investigate a security finding.
-
-**Finding Information:**
-- Title: {finding.title}
-- Severity: {finding.severity}
-- Scanner: {finding.scanner_name}
-- File: {finding.file_path}
-- Description: {finding.description or 'No description'}
-- Code Snippet: {finding.code_snippet or 'No code snippet'}
-
-**Recent Journal Entries:**
-{journal_context if journal_context else 'No previous journal entries'}
-
-Please provide helpful, actionable advice for the analyst's question. Be concise but thorough."""
+    system_prompt = _SYSTEM_PROMPT_TEMPLATE.format(
+        title=finding.title,
+        severity=finding.severity,
+        scanner_name=finding.scanner_name,
+        file_path=finding.file_path,
+        description=finding.description or 'No description',
+        code_snippet=finding.code_snippet or 'No code snippet',
+        journal_context=journal_context if journal_context else 'No previous journal entries'
+    )
 
     # Call AI provider
     ai_response = None
     try:
-        if settings.OPENAI_API_KEY:
-            import openai
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
+        if settings.OPENAI_API_KEY and openai:
+            client = _get_openai_client(settings.OPENAI_API_KEY)
+            response = await client.chat.completions.create(
                 model=settings.AI_MODEL or "gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -984,10 +1435,9 @@ Please provide helpful, actionable advice for the analyst's question. Be concise
                 max_tokens=1000
             )
             ai_response = response.choices[0].message.content
-        elif settings.ANTHROPIC_API_KEY:
-            import anthropic
-            client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-            response = client.messages.create(
+        elif settings.ANTHROPIC_API_KEY and anthropic:
+            client = _get_anthropic_client(settings.ANTHROPIC_API_KEY)
+            response = await client.messages.create(
                 model=settings.AI_MODEL or "claude-3-haiku-20240307",
                 max_tokens=1000,
                 system=system_prompt,
@@ -1008,8 +1458,7 @@ Please provide helpful, actionable advice for the analyst's question. Be concise
         author_name=request.author_name or 'Analyst',
         is_ai_generated=False
     )
-    db.add(user_entry)
-    
+
     # Save the AI response as a journal entry
     ai_entry = models.JournalEntry(
         finding_id=finding.id,
@@ -1019,9 +1468,10 @@ Please provide helpful, actionable advice for the analyst's question. Be concise
         is_ai_generated=True,
         ai_prompt=request.question
     )
-    db.add(ai_entry)
-    db.commit()
-    db.refresh(ai_entry)
+    # id and created_at are client-side defaults, so no refresh is needed
+    db.add_all([user_entry, ai_entry])
+    await db.commit()
+    _invalidate_investigation_cache(finding.id)
 
     return JournalEntryResponse(
         id=str(ai_entry.id),
@@ -1034,29 +1484,27 @@ Please provide helpful, actionable advice for the analyst's question. Be concise
     )
 
 
+def _get_journal_entry(db: Session, finding_uuid: uuid.UUID, entry_uuid: uuid.UUID) -> Optional[models.JournalEntry]:
+    """Load a journal entry only if it belongs to the finding (by finding_uuid or id)."""
+    return db.query(models.JournalEntry).join(
+        models.Finding, models.JournalEntry.finding_id == models.Finding.id
+    ).filter(
+        models.JournalEntry.id == entry_uuid,
+        _finding_id_match(finding_uuid)
+    ).first()
+
+
 @router.get("/{finding_id}/journal/{entry_id}", response_model=JournalEntryResponse)
 def get_journal_entry(finding_id: str, entry_id: str, db: Session = Depends(get_db)):
     """Get a specific journal entry for a finding."""
     try:
-        finding_uuid = uuid.UUID(finding_id)
-        entry_uuid = uuid.UUID(entry_id)
+        finding_uuid = _parse_uuid(finding_id)
+        entry_uuid = _parse_uuid(entry_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    # Find the finding
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == finding_uuid).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == finding_uuid).first()
-
-    if not finding:
-        raise HTTPException(status_code=404, detail="Finding not found")
-
-    # Find the journal entry
-    journal_entry = db.query(models.JournalEntry).filter(
-        models.JournalEntry.id == entry_uuid,
-        models.JournalEntry.finding_id == finding.id
-    ).first()
-
+    # Find the journal entry, scoped to the finding, in one query
+    journal_entry = _get_journal_entry(db, finding_uuid, entry_uuid)
     if not journal_entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
 
@@ -1080,27 +1528,16 @@ def update_journal_entry(
 ):
     """Update a journal entry for a finding."""
     try:
-        finding_uuid = uuid.UUID(finding_id)
-        entry_uuid = uuid.UUID(entry_id)
+        finding_uuid = _parse_uuid(finding_id)
+        entry_uuid = _parse_uuid(entry_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    # Find the finding
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == finding_uuid).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == finding_uuid).first()
-
-    if not finding:
-        raise HTTPException(status_code=404, detail="Finding not found")
-
-    # Find the journal entry
-    journal_entry = db.query(models.JournalEntry).filter(
-        models.JournalEntry.id == entry_uuid,
-        models.JournalEntry.finding_id == finding.id
-    ).first()
-
+    # Find the journal entry, scoped to the finding, in one query
+    journal_entry = _get_journal_entry(db, finding_uuid, entry_uuid)
     if not journal_entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
+    finding_pk = journal_entry.finding_id
 
     # Prevent editing system-generated status change entries
     if journal_entry.entry_type == 'status_change' and journal_entry.author_name == 'System':
@@ -1113,18 +1550,13 @@ def update_journal_entry(
     if update.entry_text is not None:
         journal_entry.entry_text = update.entry_text
     if update.entry_type is not None:
-        valid_types = ['note', 'status_change', 'ai_response', 'communication']
-        if update.entry_type not in valid_types:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid entry_type. Must be one of: {', '.join(valid_types)}"
-            )
         journal_entry.entry_type = update.entry_type
     if update.author_name is not None:
         journal_entry.author_name = update.author_name
 
     db.commit()
     db.refresh(journal_entry)
+    _invalidate_investigation_cache(finding_pk)
 
     return JournalEntryResponse(
         id=str(journal_entry.id),
@@ -1141,27 +1573,16 @@ def update_journal_entry(
 def delete_journal_entry(finding_id: str, entry_id: str, db: Session = Depends(get_db)):
     """Delete a journal entry for a finding."""
     try:
-        finding_uuid = uuid.UUID(finding_id)
-        entry_uuid = uuid.UUID(entry_id)
+        finding_uuid = _parse_uuid(finding_id)
+        entry_uuid = _parse_uuid(entry_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    # Find the finding
-    finding = db.query(models.Finding).filter(models.Finding.finding_uuid == finding_uuid).first()
-    if not finding:
-        finding = db.query(models.Finding).filter(models.Finding.id == finding_uuid).first()
-
-    if not finding:
-        raise HTTPException(status_code=404, detail="Finding not found")
-
-    # Find the journal entry
-    journal_entry = db.query(models.JournalEntry).filter(
-        models.JournalEntry.id == entry_uuid,
-        models.JournalEntry.finding_id == finding.id
-    ).first()
-
+    # Find the journal entry, scoped to the finding, in one query
+    journal_entry = _get_journal_entry(db, finding_uuid, entry_uuid)
     if not journal_entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
+    finding_pk = journal_entry.finding_id
 
     # Prevent deleting system-generated status change entries
     if journal_entry.entry_type == 'status_change' and journal_entry.author_name == 'System':
@@ -1172,6 +1593,7 @@ def delete_journal_entry(finding_id: str, entry_id: str, db: Session = Depends(g
 
     db.delete(journal_entry)
     db.commit()
+    _invalidate_investigation_cache(finding_pk)
 
     return {
         "status": "success",
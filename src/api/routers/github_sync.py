@@ -4,16 +4,31 @@ Provides endpoints to sync and access GitHub API data stored locally.
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import distinct, exists, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import ProgrammingError
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
 from pydantic import BaseModel
+import io
 import os
-import requests
+import asyncio
+import httpx
 import logging
+import threading
+import time
+import uuid
+from cachetools import LRUCache, TTLCache
 
-from ..database import get_db
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    # Python 3.11+ accepts GitHub's trailing "Z" directly
+    _parse_iso_datetime = datetime.fromisoformat
+
+from ..database import SessionLocal, get_db
 from .. import models
+from .projects import invalidate_project_cache
 
 logger = logging.getLogger(__name__)
 
@@ -71,107 +86,389 @@ class SyncResult(BaseModel):
     message: str
     repos_synced: int = 0
     files_synced: int = 0
+    job_id: Optional[str] = None  # SyncJob tracking a background sync
+
+
+class SyncJobStatus(BaseModel):
+    """Progress of a background sync job."""
+    job_id: str
+    job_type: str
+    status: str
+    total_items: int = 0
+    items_synced: int = 0
+    items_failed: int = 0
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
 
 # =============================================================================
 # GitHub API Helper
 # =============================================================================
 
+# Returned by GitHubClient when a conditional request gets 304 Not Modified and
+# the caller's stored copy is still current
+NOT_MODIFIED = object()
+
+
 class GitHubClient:
-    """Simple GitHub API client for metadata fetching."""
+    """Simple async GitHub API client for metadata fetching."""
     
     BASE_URL = "https://api.github.com"
+    POOL_SIZE = 50  # Keep-alive connections reused across sync calls
+    MAX_CONCURRENCY = 10  # In-flight requests across all syncs (GitHub secondary rate limits)
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.3
+    MAX_RETRY_WAIT = 60  # Longest Retry-After / rate-limit reset worth waiting for, in seconds
+    REPO_CACHE_TTL = 300  # Repo metadata rarely changes within a sync pass
+    GRAPHQL_BATCH_SIZE = 50  # File paths per GraphQL query, well under node limits
     
     def __init__(self):
-        self.token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
+        # GITHUB_TOKENS (comma-separated) spreads syncs across several tokens'
+        # rate limits; otherwise the single GITHUB_TOKEN / GH_TOKEN is used
+        self.tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
+        if not self.tokens:
+            single = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
+            self.tokens = [single] if single else []
+        self.token = self.tokens[0] if self.tokens else None
         self.org = os.getenv("GITHUB_ORG")
-        self.session = requests.Session()
+        # Last X-RateLimit-Remaining seen per token; unseen tokens are tried first
+        self._rate_remaining: Dict[str, int] = {}
+        headers = {}
         if self.token:
-            self.session.headers.update({
-                "Authorization": f"token {self.token}",
+            headers = {
                 "Accept": "application/vnd.github.v3+json",
-                "User-Agent": "AuditGH/1.0"
-            })
+                "User-Agent": "AuditGH/1.0",
+                "Accept-Encoding": "gzip",  # API JSON compresses well
+            }
+        # One pooled client for the process so bulk syncs reuse TLS connections
+        self.client = httpx.AsyncClient(
+            base_url=self.BASE_URL,
+            headers=headers,
+            timeout=30,
+            # Limits belong on the transport: the client ignores its own when one is given
+            transport=httpx.AsyncHTTPTransport(
+                retries=self.MAX_RETRIES,  # connect errors
+                limits=httpx.Limits(max_connections=self.POOL_SIZE, max_keepalive_connections=self.POOL_SIZE)
+            )
+        )
+        # Fresh get_repo results, plus the last (ETag, body) per repo so expired
+        # entries are revalidated with If-None-Match; GitHub does not count
+        # 304 Not Modified responses against the rate limit
+        self._repo_cache: TTLCache = TTLCache(maxsize=1024, ttl=self.REPO_CACHE_TTL)
+        self._repo_etags: LRUCache = LRUCache(maxsize=4096)
+        self._commit_etags: LRUCache = LRUCache(maxsize=4096)
+        # Shared by every gather() so overlapping background syncs together
+        # stay within MAX_CONCURRENCY requests
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
     
-    def get_repo(self, repo_name: str) -> Optional[dict]:
-        """Fetch repository metadata from GitHub API."""
-        if not self.token or not self.org:
+    def _pick_token(self) -> Optional[str]:
+        """Token with the most rate limit left, by the last response seen for each."""
+        if not self.tokens:
             return None
+        return max(self.tokens, key=lambda t: self._rate_remaining.get(t, float("inf")))
+    
+    def _retry_delay(self, resp: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying resp, or None if it should not be retried.
+        
+        Honors Retry-After and, for GitHub's 403 rate-limit responses,
+        X-RateLimit-Reset; waits longer than MAX_RETRY_WAIT are not retried.
+        """
+        rate_limited = resp.status_code == 403 and (
+            "Retry-After" in resp.headers or resp.headers.get("X-RateLimit-Remaining") == "0"
+        )
+        if resp.status_code not in self.RETRY_STATUSES and not rate_limited:
+            return None
+        delay = self.BACKOFF_FACTOR * (2 ** attempt)
         try:
-            resp = self.session.get(f"{self.BASE_URL}/repos/{self.org}/{repo_name}")
+            if "Retry-After" in resp.headers:
+                delay = max(delay, float(resp.headers["Retry-After"]))
+            elif resp.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in resp.headers:
+                delay = max(delay, float(resp.headers["X-RateLimit-Reset"]) - time.time())
+        except ValueError:
+            pass
+        return delay if delay <= self.MAX_RETRY_WAIT else None
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request with exponential backoff on rate limiting and transient errors."""
+        headers = kwargs.pop("headers", None) or {}
+        for attempt in range(self.MAX_RETRIES + 1):
+            token = self._pick_token()
+            if token:
+                headers["Authorization"] = f"token {token}"
+            resp = await self.client.request(method, url, headers=headers, **kwargs)
+            remaining = resp.headers.get("X-RateLimit-Remaining")
+            if token and remaining is not None and remaining.isdigit():
+                self._rate_remaining[token] = int(remaining)
+            if attempt == self.MAX_RETRIES:
+                break
+            if remaining == "0" and resp.status_code in (403, 429) and self._pick_token() != token:
+                continue  # This token is exhausted; retry at once with another
+            delay = self._retry_delay(resp, attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        if resp.status_code != 304:  # Not Modified answers a conditional request
             resp.raise_for_status()
-            return resp.json()
+        return resp
+    
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._request("GET", url, **kwargs)
+    
+    async def get_repo(self, repo_name: str, use_cache: bool = True, etag: Optional[str] = None):
+        """Fetch repository metadata from GitHub API.
+        
+        With use_cache=False the TTL cache is skipped, but the request is
+        still conditional on the last ETag. Pass the stored ETag as etag to
+        get NOT_MODIFIED back when GitHub answers 304 and the body is not
+        held in memory.
+        """
+        if not self.token or not self.org:
+            return None
+        cached = self._repo_cache.get(repo_name) if use_cache else None
+        if cached is not None:
+            return cached
+        validator = self._repo_etags.get(repo_name)
+        send_etag = validator[0] if validator else etag
+        headers = {"If-None-Match": send_etag} if send_etag else {}
+        try:
+            resp = await self._get(f"/repos/{self.org}/{repo_name}", headers=headers)
         except Exception as e:
             logger.warning(f"Failed to fetch repo {repo_name}: {e}")
             return None
+        if resp.status_code == 304:
+            if not validator:
+                return NOT_MODIFIED
+            data = validator[1]
+        else:
+            data = resp.json()
+            new_etag = resp.headers.get("ETag")
+            if new_etag:
+                self._repo_etags[repo_name] = (new_etag, data)
+        self._repo_cache[repo_name] = data
+        return data
+    
+    def repo_etag(self, repo_name: str) -> Optional[str]:
+        """ETag of the last repo metadata response seen for repo_name."""
+        validator = self._repo_etags.get(repo_name)
+        return validator[0] if validator else None
     
-    def get_file_commits(self, repo_name: str, file_path: str, per_page: int = 1) -> Optional[list]:
-        """Fetch commit history for a specific file."""
+    async def get_file_commits(self, repo_name: str, file_path: str, per_page: int = 1, etag: Optional[str] = None):
+        """Fetch commit history for a specific file.
+        
+        Returns NOT_MODIFIED when etag is given and GitHub answers 304.
+        """
         if not self.token or not self.org:
             return None
+        headers = {"If-None-Match": etag} if etag else {}
         try:
-            resp = self.session.get(
-                f"{self.BASE_URL}/repos/{self.org}/{repo_name}/commits",
-                params={"path": file_path, "per_page": per_page}
+            resp = await self._get(
+                f"/repos/{self.org}/{repo_name}/commits",
+                params={"path": file_path, "per_page": per_page},
+                headers=headers
             )
-            resp.raise_for_status()
-            return resp.json()
         except Exception as e:
             logger.warning(f"Failed to fetch commits for {repo_name}/{file_path}: {e}")
             return None
+        if resp.status_code == 304:
+            return NOT_MODIFIED
+        new_etag = resp.headers.get("ETag")
+        if new_etag:
+            self._commit_etags[(repo_name, file_path)] = new_etag
+        return resp.json()
+    
+    def commits_etag(self, repo_name: str, file_path: str) -> Optional[str]:
+        """ETag of the last commits response seen for a file."""
+        return self._commit_etags.get((repo_name, file_path))
+    
+    async def get_branch_head(self, repo_name: str, branch: Optional[str] = None) -> Optional[str]:
+        """Fetch the commit SHA at the tip of branch (the default branch if None)."""
+        if not self.token or not self.org:
+            return None
+        try:
+            resp = await self._get(
+                f"/repos/{self.org}/{repo_name}/commits/{branch or 'HEAD'}",
+                headers={"Accept": "application/vnd.github.sha"}  # Bare SHA instead of the full commit
+            )
+        except Exception as e:
+            logger.warning(f"Failed to fetch head of {repo_name}: {e}")
+            return None
+        return resp.text.strip() or None
+    
+    async def _get_file_commits_chunk(self, repo_name: str, file_paths: List[str]) -> Dict[str, Optional[list]]:
+        """One GraphQL query for the latest default-branch commit of each path."""
+        fields = "\n".join(
+            f"f{i}: history(first: 1, path: $p{i}) {{ nodes {{ oid message author {{ name date }} }} }}"
+            for i in range(len(file_paths))
+        )
+        params = "".join(f", $p{i}: String!" for i in range(len(file_paths)))
+        query = (
+            f"query($owner: String!, $name: String!{params}) {{"
+            f" repository(owner: $owner, name: $name) {{ defaultBranchRef {{ target {{"
+            f" ... on Commit {{ {fields} }} }} }} }} }}"
+        )
+        variables = {"owner": self.org, "name": repo_name}
+        variables.update({f"p{i}": path for i, path in enumerate(file_paths)})
+        try:
+            resp = await self._request("POST", "/graphql", json={"query": query, "variables": variables})
+            payload = resp.json()
+        except Exception as e:
+            logger.warning(f"Failed to fetch commits for {len(file_paths)} files in {repo_name}: {e}")
+            return {}
+        if payload.get("errors"):
+            logger.warning(f"GraphQL errors fetching commits for {repo_name}: {payload['errors']}")
+        
+        repository = (payload.get("data") or {}).get("repository") or {}
+        target = (repository.get("defaultBranchRef") or {}).get("target") or {}
+        results: Dict[str, Optional[list]] = {}
+        for i, path in enumerate(file_paths):
+            nodes = (target.get(f"f{i}") or {}).get("nodes") or []
+            # Same shape as the REST commits response so store_file_commit handles both
+            results[path] = [{
+                "sha": node.get("oid"),
+                "commit": {"message": node.get("message") or "", "author": node.get("author") or {}}
+            } for node in nodes]
+        return results
+    
+    async def get_file_commits_batch(self, repo_name: str, file_paths: Iterable[str]) -> Dict[str, Optional[list]]:
+        """Fetch the latest commit for many files via GraphQL, GRAPHQL_BATCH_SIZE paths per request.
+        
+        Duplicate paths are fetched once. Returns a map of file path to a
+        REST-shaped commits list; paths that could not be fetched are missing
+        from the map.
+        """
+        # Sorted so batches are stable across runs
+        file_paths = sorted(set(file_paths))
+        if not self.token or not self.org or not file_paths:
+            return {}
+        chunks = [
+            file_paths[i:i + self.GRAPHQL_BATCH_SIZE]
+            for i in range(0, len(file_paths), self.GRAPHQL_BATCH_SIZE)
+        ]
+        results: Dict[str, Optional[list]] = {}
+        for chunk_result in await self.gather(self._get_file_commits_chunk(repo_name, c) for c in chunks):
+            results.update(chunk_result)
+        return results
+    
+    async def gather(self, coros) -> list:
+        """Run GitHub calls concurrently, at most MAX_CONCURRENCY at a time, preserving order.
+        
+        The coroutines must not call gather() themselves: the limit is shared.
+        """
+        async def bounded(coro):
+            async with self._semaphore:
+                return await coro
+        
+        return await asyncio.gather(*(bounded(c) for c in coros))
 
 
 github_client = GitHubClient()
 
+# GET /sync-status is polled by the dashboard. The result is cached briefly,
+# keyed by a generation counter that every sync write bumps, and computed under
+# a lock so a burst of pollers runs the aggregate queries once.
+_sync_status_cache: TTLCache = TTLCache(maxsize=2, ttl=10)  # keyed (generation, approximate)
+_sync_status_generation = 0
+_sync_status_cache_lock = threading.Lock()
+_sync_status_compute_lock = threading.Lock()
+
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def _invalidate_sync_status() -> None:
+    """Drop the cached sync status after a sync write."""
+    global _sync_status_generation
+    with _sync_status_cache_lock:
+        _sync_status_generation += 1
+        _sync_status_cache.clear()
+
+
+def update_sync_job(db: Session, job_id, **values) -> None:
+    """Record progress or the outcome of a SyncJob."""
+    db.query(models.SyncJob).filter(models.SyncJob.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+
+
+def sync_job_status(job: models.SyncJob) -> SyncJobStatus:
+    """Build the API view of a SyncJob."""
+    return SyncJobStatus(
+        job_id=str(job.id),
+        job_type=job.job_type,
+        status=job.status,
+        total_items=job.total_items or 0,
+        items_synced=job.items_synced or 0,
+        items_failed=job.items_failed or 0,
+        error_message=job.error_message,
+        started_at=job.started_at,
+        completed_at=job.completed_at
+    )
+
+
 def parse_github_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     """Parse GitHub API datetime string to datetime object."""
     if not dt_str:
         return None
     try:
-        return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+        return _parse_iso_datetime(dt_str)
     except Exception:
         return None
 
 
+def repo_metadata_values(github_data: dict, etag: Optional[str] = None) -> dict:
+    """Map a GitHub API repository payload to Repository column values."""
+    values = {
+        'pushed_at': parse_github_datetime(github_data.get('pushed_at')),
+        'github_created_at': parse_github_datetime(github_data.get('created_at')),
+        'github_updated_at': parse_github_datetime(github_data.get('updated_at')),
+        'stargazers_count': github_data.get('stargazers_count', 0),
+        'watchers_count': github_data.get('watchers_count', 0),
+        'forks_count': github_data.get('forks_count', 0),
+        'open_issues_count': github_data.get('open_issues_count', 0),
+        'size_kb': github_data.get('size', 0),
+        'is_fork': github_data.get('fork', False),
+        'is_archived': github_data.get('archived', False),
+        'is_disabled': github_data.get('disabled', False),
+        'is_private': github_data.get('private', True),
+        'visibility': github_data.get('visibility'),
+        'topics': github_data.get('topics', []),
+        'default_branch': github_data.get('default_branch', 'main'),
+        'full_name': github_data.get('full_name'),
+        'url': github_data.get('html_url'),
+        'description': github_data.get('description'),
+        'language': github_data.get('language'),
+        # Wiki/Pages/Discussions
+        'has_wiki': github_data.get('has_wiki', False),
+        'has_pages': github_data.get('has_pages', False),
+        'has_discussions': github_data.get('has_discussions', False),
+        'github_etag': etag,
+    }
+    
+    # License
+    license_info = github_data.get('license')
+    if license_info and isinstance(license_info, dict):
+        values['license_name'] = license_info.get('spdx_id') or license_info.get('name')
+    
+    return values
+
+
 def sync_repo_metadata(db: Session, repo: models.Repository, github_data: dict) -> bool:
     """Update repository with GitHub API metadata."""
+    # Unchanged since the last stored sync: nothing to write
+    etag = github_client.repo_etag(repo.name)
+    if etag and etag == repo.github_etag:
+        return True
     try:
-        repo.pushed_at = parse_github_datetime(github_data.get('pushed_at'))
-        repo.github_created_at = parse_github_datetime(github_data.get('created_at'))
-        repo.github_updated_at = parse_github_datetime(github_data.get('updated_at'))
-        repo.stargazers_count = github_data.get('stargazers_count', 0)
-        repo.watchers_count = github_data.get('watchers_count', 0)
-        repo.forks_count = github_data.get('forks_count', 0)
-        repo.open_issues_count = github_data.get('open_issues_count', 0)
-        repo.size_kb = github_data.get('size', 0)
-        repo.is_fork = github_data.get('fork', False)
-        repo.is_archived = github_data.get('archived', False)
-        repo.is_disabled = github_data.get('disabled', False)
-        repo.is_private = github_data.get('private', True)
-        repo.visibility = github_data.get('visibility')
-        repo.topics = github_data.get('topics', [])
-        repo.default_branch = github_data.get('default_branch', 'main')
-        repo.full_name = github_data.get('full_name')
-        repo.url = github_data.get('html_url')
-        repo.description = github_data.get('description')
-        repo.language = github_data.get('language')
-        
-        # License
-        license_info = github_data.get('license')
-        if license_info and isinstance(license_info, dict):
-            repo.license_name = license_info.get('spdx_id') or license_info.get('name')
-        
-        # Wiki/Pages/Discussions
-        repo.has_wiki = github_data.get('has_wiki', False)
-        repo.has_pages = github_data.get('has_pages', False)
-        repo.has_discussions = github_data.get('has_discussions', False)
-        
+        db.execute(
+            update(models.Repository)
+            .where(models.Repository.id == repo.id)
+            .values(**repo_metadata_values(github_data, etag))
+        )
         db.commit()
+        _invalidate_sync_status()
+        invalidate_project_cache()
         return True
     except Exception as e:
         logger.error(f"Failed to sync repo metadata for {repo.name}: {e}")
@@ -179,9 +476,40 @@ def sync_repo_metadata(db: Session, repo: models.Repository, github_data: dict)
         return False
 
 
-def sync_file_commit(db: Session, repo: models.Repository, file_path: str) -> Optional[models.FileCommit]:
-    """Fetch and store file commit information from GitHub API."""
-    commits = github_client.get_file_commits(repo.name, file_path)
+REPO_UPDATE_BATCH_SIZE = 500
+
+
+def bulk_sync_repo_metadata(db: Session, updates: List[dict]) -> int:
+    """Apply repo_metadata_values() dicts (plus the repository id) in batches.
+    
+    Returns the number of repositories updated; a failed batch is rolled back
+    and skipped.
+    """
+    updated = 0
+    for start in range(0, len(updates), REPO_UPDATE_BATCH_SIZE):
+        batch = updates[start:start + REPO_UPDATE_BATCH_SIZE]
+        try:
+            # ORM bulk UPDATE by primary key: one executemany per batch
+            db.execute(update(models.Repository), batch)
+            db.commit()
+            updated += len(batch)
+        except Exception as e:
+            logger.error(f"Failed to sync repo metadata batch: {e}")
+            db.rollback()
+    if updated:
+        _invalidate_sync_status()
+        invalidate_project_cache()
+    return updated
+
+
+def store_file_commit(
+    db: Session,
+    repo: models.Repository,
+    file_path: str,
+    commits: Optional[list],
+    etag: Optional[str] = None
+) -> Optional[models.FileCommit]:
+    """Store the latest commit from a GitHub commits response as the file's commit record."""
     if not commits or len(commits) == 0:
         return None
     
@@ -207,8 +535,10 @@ def sync_file_commit(db: Session, repo: models.Repository, file_path: str) -> Op
         file_commit.last_commit_date = parse_github_datetime(author_info.get('date'))
         file_commit.last_commit_author = author_info.get('name')
         file_commit.last_commit_message = commit_info.get('message', '')[:500]  # Truncate long messages
+        file_commit.github_etag = etag
         
         db.commit()
+        _invalidate_sync_status()
         db.refresh(file_commit)
         return file_commit
     except Exception as e:
@@ -217,6 +547,255 @@ def sync_file_commit(db: Session, repo: models.Repository, file_path: str) -> Op
         return None
 
 
+async def sync_file_commit(
+    db: Session,
+    repo: models.Repository,
+    file_path: str,
+    existing: Optional[models.FileCommit] = None
+) -> Optional[models.FileCommit]:
+    """Fetch and store file commit information from GitHub API.
+    
+    When the stored record is passed as existing, the request is conditional
+    on its ETag and a 304 returns it unchanged.
+    """
+    etag = existing.github_etag if existing else None
+    commits = await github_client.get_file_commits(repo.name, file_path, etag=etag)
+    if commits is NOT_MODIFIED:
+        return existing
+    # Blocking DB write: keep it off the event loop
+    return await asyncio.to_thread(
+        store_file_commit, db, repo, file_path, commits, github_client.commits_etag(repo.name, file_path)
+    )
+
+
+# Materialized finding/file match counts for approximate sync status
+# (migrations/add_finding_sync_counts_view.sql)
+FINDING_SYNC_COUNTS_VIEW = "mv_finding_sync_counts"
+
+# A queued/running SyncJob with no progress for this long is treated as dead
+SYNC_JOB_STALE_AFTER = timedelta(minutes=30)
+# Transaction-scoped lock held while POST /sync-all-files looks for an active
+# file sync job and creates one
+_FILE_SYNC_JOB_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('file_sync_job'))")
+
+# Rows per INSERT ... ON CONFLICT statement, well under the bind parameter limit
+UPSERT_BATCH_SIZE = 1000
+# From this many rows on, upserts are loaded with COPY into a staging table
+# instead of multi-row INSERTs (typically the first sync of a large org)
+COPY_MIN_ROWS = 2000
+
+_FILE_COMMIT_COPY_COLUMNS = (
+    "repository_id", "file_path", "last_commit_sha",
+    "last_commit_date", "last_commit_author", "last_commit_message",
+)
+
+
+def _copy_text_value(value) -> str:
+    """Encode one value for COPY ... FROM STDIN text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _copy_upsert_file_commits(db: Session, rows: List[dict]) -> None:
+    """Upsert file commit rows via COPY into a temp table, then one INSERT ... SELECT."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_text_value(row[col]) for col in _FILE_COMMIT_COPY_COLUMNS))
+        buf.write("\n")
+    buf.seek(0)
+    
+    columns = ", ".join(_FILE_COMMIT_COPY_COLUMNS)
+    db.execute(text(
+        "CREATE TEMP TABLE file_commits_staging ON COMMIT DROP AS "
+        f"SELECT {columns} FROM file_commits WITH NO DATA"
+    ))
+    # psycopg2 cursor on the session's connection, inside the same transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY file_commits_staging ({columns}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+    db.execute(text(
+        f"INSERT INTO file_commits ({columns}) "
+        f"SELECT {columns} FROM file_commits_staging "
+        "ON CONFLICT ON CONSTRAINT uq_file_commits_repo_path DO UPDATE SET "
+        "last_commit_sha = EXCLUDED.last_commit_sha, "
+        "last_commit_date = EXCLUDED.last_commit_date, "
+        "last_commit_author = EXCLUDED.last_commit_author, "
+        "last_commit_message = EXCLUDED.last_commit_message, "
+        "updated_at = now()"
+    ))
+
+
+def upsert_file_commits(db: Session, repo: models.Repository, all_commits: Dict[str, Optional[list]]) -> int:
+    """Bulk upsert the latest commit per file in one transaction.
+    
+    Returns the number of file commit rows written.
+    """
+    # Read the id once: on an expired instance each access is a refresh query
+    repository_id = repo.id
+    rows = []
+    for file_path, commits in all_commits.items():
+        if not commits:
+            continue
+        commit_data = commits[0]
+        commit_info = commit_data.get('commit', {})
+        author_info = commit_info.get('author', {})
+        rows.append({
+            "repository_id": repository_id,
+            "file_path": file_path,
+            "last_commit_sha": commit_data.get('sha'),
+            "last_commit_date": parse_github_datetime(author_info.get('date')),
+            "last_commit_author": author_info.get('name'),
+            "last_commit_message": commit_info.get('message', '')[:500],  # Truncate long messages
+        })
+    if not rows:
+        return 0
+    
+    try:
+        if len(rows) >= COPY_MIN_ROWS:
+            _copy_upsert_file_commits(db, rows)
+        else:
+            for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+                stmt = pg_insert(models.FileCommit).values(rows[i:i + UPSERT_BATCH_SIZE])
+                db.execute(stmt.on_conflict_do_update(
+                    constraint="uq_file_commits_repo_path",
+                    set_={
+                        "last_commit_sha": stmt.excluded.last_commit_sha,
+                        "last_commit_date": stmt.excluded.last_commit_date,
+                        "last_commit_author": stmt.excluded.last_commit_author,
+                        "last_commit_message": stmt.excluded.last_commit_message,
+                        "updated_at": func.now(),
+                    }
+                ))
+        db.commit()
+        _invalidate_sync_status()
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Failed to upsert file commits for {repo.name}: {e}")
+        db.rollback()
+        return 0
+
+
+def stored_file_commit_paths(db: Session, repository_id, file_paths: Iterable[str]) -> set:
+    """The subset of file_paths that already have a FileCommit row."""
+    return set(db.scalars(
+        select(models.FileCommit.file_path).where(
+            models.FileCommit.repository_id == repository_id,
+            models.FileCommit.file_path.in_(list(file_paths))
+        )
+    ))
+
+
+def get_repo_by_name(db: Session, repo_name: str) -> Optional[models.Repository]:
+    """The repository with this name, or None."""
+    return db.query(models.Repository).filter(models.Repository.name == repo_name).first()
+
+
+def get_stored_file_commit(db: Session, repository_id, file_path: str) -> Optional[models.FileCommit]:
+    """The stored FileCommit for one file, or None."""
+    return db.query(models.FileCommit).filter(
+        models.FileCommit.repository_id == repository_id,
+        models.FileCommit.file_path == file_path
+    ).first()
+
+
+def finding_file_paths(db: Session, repository_id) -> List[str]:
+    """Unique file paths that have findings in a repository."""
+    return db.scalars(
+        select(distinct(models.Finding.file_path)).where(
+            models.Finding.repository_id == repository_id,
+            models.Finding.file_path.isnot(None),
+            models.Finding.file_path != ''
+        )
+    ).all()
+
+
+def update_repo_head(db: Session, repo: models.Repository, head: str) -> None:
+    """Record the default branch HEAD the file commits were synced at."""
+    try:
+        db.execute(
+            update(models.Repository)
+            .where(models.Repository.id == repo.id)
+            .values(last_synced_head_sha=head)
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record head for {repo.name}: {e}")
+        db.rollback()
+
+
+async def sync_file_commits_bulk(db: Session, repo: models.Repository, file_paths: Iterable[str]) -> int:
+    """Fetch the latest commits for many files in batched GraphQL queries and store them.
+    
+    Returns the number of distinct files stored.
+    """
+    paths = set(file_paths)
+    # Read before the upsert commits: with a default session that expires repo,
+    # and reloading it would be a blocking query on the event loop
+    last_head = repo.last_synced_head_sha
+    head = await github_client.get_branch_head(repo.name, repo.default_branch)
+    unchanged = 0
+    if head and head == last_head:
+        # Nothing was pushed since the last full sync: stored commits are
+        # current, only files without a stored row need fetching
+        stored = await asyncio.to_thread(stored_file_commit_paths, db, repo.id, paths)
+        unchanged = len(stored)
+        paths -= stored
+        if not paths:
+            return unchanged
+    
+    all_commits = await github_client.get_file_commits_batch(repo.name, paths)
+    # Blocking DB write: keep it off the event loop
+    synced = await asyncio.to_thread(upsert_file_commits, db, repo, all_commits)
+    
+    # Remember the head only when every lookup answered and every row was
+    # stored, so a partial sync is retried in full next time. Files with no
+    # commits have no row and are looked up again regardless.
+    complete = len(all_commits) == len(paths) and synced == sum(1 for c in all_commits.values() if c)
+    if head and head != last_head and complete:
+        await asyncio.to_thread(update_repo_head, db, repo, head)
+    return unchanged + synced
+
+
+def apply_repo_metadata(repo_names: List[str], all_github_data: list) -> int:
+    """Store fetched metadata for repo_names in one session.
+    
+    Returns the number of repositories that are now in sync.
+    """
+    db_session = SessionLocal()
+    try:
+        repo_rows = db_session.query(
+            models.Repository.name, models.Repository.id, models.Repository.github_etag
+        ).filter(models.Repository.name.in_(repo_names)).all()
+        repos_by_name = {name: (repo_id, stored_etag) for name, repo_id, stored_etag in repo_rows}
+        synced = 0
+        updates = []
+        for name, github_data in zip(repo_names, all_github_data):
+            if github_data is NOT_MODIFIED:
+                synced += 1
+                continue
+            if not github_data or name not in repos_by_name:
+                continue
+            repo_id, stored_etag = repos_by_name[name]
+            etag = github_client.repo_etag(name)
+            if etag and etag == stored_etag:
+                # Served from the in-memory validator, already stored
+                synced += 1
+                continue
+            values = repo_metadata_values(github_data, etag)
+            values['id'] = repo_id
+            updates.append(values)
+        synced += bulk_sync_repo_metadata(db_session, updates)
+        return synced
+    finally:
+        db_session.close()
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -254,17 +833,20 @@ def get_repo_metadata(repo_name: str, db: Session = Depends(get_db)):
 
 
 @router.post("/repos/{repo_name}/sync", response_model=SyncResult)
-def sync_repo_from_github(repo_name: str, db: Session = Depends(get_db)):
+async def sync_repo_from_github(repo_name: str, db: Session = Depends(get_db)):
     """Sync repository metadata from GitHub API."""
-    repo = db.query(models.Repository).filter(models.Repository.name == repo_name).first()
+    # The session is sync: every query runs in a worker thread, off the event loop
+    repo = await asyncio.to_thread(get_repo_by_name, db, repo_name)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
     
-    github_data = github_client.get_repo(repo_name)
+    # An explicit sync always revalidates with GitHub
+    github_data = await github_client.get_repo(repo_name, use_cache=False, etag=repo.github_etag)
     if not github_data:
         raise HTTPException(status_code=502, detail="Failed to fetch data from GitHub API")
     
-    success = sync_repo_metadata(db, repo, github_data)
+    # 304 against the stored ETag: the stored metadata is current
+    success = github_data is NOT_MODIFIED or await asyncio.to_thread(sync_repo_metadata, db, repo, github_data)
     
     return SyncResult(
         success=success,
@@ -278,20 +860,20 @@ def sync_all_repos(background_tasks: BackgroundTasks, db: Session = Depends(get_
     """Sync all repositories from GitHub API (runs in background)."""
     repos = db.query(models.Repository).all()
     
-    def sync_all(repo_names: List[str]):
+    async def sync_all(repo_etags: Dict[str, Optional[str]]):
         """Background task to sync all repos."""
-        db_session = next(get_db())
-        synced = 0
-        for name in repo_names:
-            repo = db_session.query(models.Repository).filter(models.Repository.name == name).first()
-            if repo:
-                github_data = github_client.get_repo(name)
-                if github_data and sync_repo_metadata(db_session, repo, github_data):
-                    synced += 1
+        repo_names = list(repo_etags)
+        # Fetch metadata for all repos concurrently (conditional on the stored
+        # ETags), then apply it
+        all_github_data = await github_client.gather(
+            github_client.get_repo(name, etag=repo_etags[name]) for name in repo_names
+        )
+        # Blocking DB work runs in a worker thread so the event loop stays free
+        # for other requests and background syncs
+        synced = await asyncio.to_thread(apply_repo_metadata, repo_names, all_github_data)
         logger.info(f"Synced {synced}/{len(repo_names)} repositories")
     
-    repo_names = [r.name for r in repos]
-    background_tasks.add_task(sync_all, repo_names)
+    background_tasks.add_task(sync_all, {r.name: r.github_etag for r in repos})
     
     return SyncResult(
         success=True,
@@ -301,7 +883,7 @@ def sync_all_repos(background_tasks: BackgroundTasks, db: Session = Depends(get_
 
 
 @router.get("/repos/{repo_name}/files/{file_path:path}/commit", response_model=FileCommitInfo)
-def get_file_commit(repo_name: str, file_path: str, refresh: bool = False, db: Session = Depends(get_db)):
+async def get_file_commit(repo_name: str, file_path: str, refresh: bool = False, db: Session = Depends(get_db)):
     """Get last commit information for a specific file.
     
     Args:
@@ -309,19 +891,17 @@ def get_file_commit(repo_name: str, file_path: str, refresh: bool = False, db: S
         file_path: Path to the file within the repository
         refresh: If true, fetch fresh data from GitHub API
     """
-    repo = db.query(models.Repository).filter(models.Repository.name == repo_name).first()
+    # The session is sync: every query runs in a worker thread, off the event loop
+    repo = await asyncio.to_thread(get_repo_by_name, db, repo_name)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
     
     # Check if we have cached data
-    file_commit = db.query(models.FileCommit).filter(
-        models.FileCommit.repository_id == repo.id,
-        models.FileCommit.file_path == file_path
-    ).first()
+    file_commit = await asyncio.to_thread(get_stored_file_commit, db, repo.id, file_path)
     
     # Fetch from GitHub if no cache or refresh requested
     if not file_commit or refresh:
-        file_commit = sync_file_commit(db, repo, file_path)
+        file_commit = await sync_file_commit(db, repo, file_path, existing=file_commit)
         if not file_commit:
             raise HTTPException(status_code=404, detail="No commit data found for this file")
     
@@ -335,28 +915,20 @@ def get_file_commit(repo_name: str, file_path: str, refresh: bool = False, db: S
 
 
 @router.post("/repos/{repo_name}/files/sync", response_model=SyncResult)
-def sync_files_for_findings(repo_name: str, db: Session = Depends(get_db)):
+async def sync_files_for_findings(repo_name: str, db: Session = Depends(get_db)):
     """Sync file commit data for all files with findings in a repository."""
-    repo = db.query(models.Repository).filter(models.Repository.name == repo_name).first()
+    # The session is sync: every query runs in a worker thread, off the event loop
+    repo = await asyncio.to_thread(get_repo_by_name, db, repo_name)
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
     
     # Get unique file paths from findings
-    file_paths = db.query(models.Finding.file_path).filter(
-        models.Finding.repository_id == repo.id,
-        models.Finding.file_path.isnot(None)
-    ).distinct().all()
-    
-    synced = 0
-    for (file_path,) in file_paths:
-        if file_path:
-            result = sync_file_commit(db, repo, file_path)
-            if result:
-                synced += 1
+    paths = await asyncio.to_thread(finding_file_paths, db, repo.id)
+    synced = await sync_file_commits_bulk(db, repo, paths)
     
     return SyncResult(
         success=True,
-        message=f"Synced commit data for {synced}/{len(file_paths)} files",
+        message=f"Synced commit data for {synced}/{len(paths)} files",
         files_synced=synced
     )
 
@@ -366,49 +938,83 @@ def sync_all_files_for_findings(background_tasks: BackgroundTasks, db: Session =
     """Sync file commit data for ALL files with findings across all repositories.
     
     This runs in the background and may take a while for large numbers of files.
-    Use GET /github/sync-status to check progress.
+    Progress is tracked in a SyncJob; poll GET /github/sync-jobs/{job_id} or
+    GET /github/sync-status. Only one file sync runs at a time; while one is
+    active its job is returned instead of starting another.
     """
-    from ..database import SessionLocal
+    # Serialize the check-then-insert below across requests and processes;
+    # released when this transaction commits or rolls back
+    db.execute(_FILE_SYNC_JOB_LOCK)
+    active = db.query(models.SyncJob).filter(
+        models.SyncJob.job_type == "files",
+        models.SyncJob.status.in_(["queued", "running"]),
+        # A job whose process died stops reporting progress; don't wait on it forever
+        models.SyncJob.updated_at > datetime.utcnow() - SYNC_JOB_STALE_AFTER
+    ).order_by(models.SyncJob.created_at.desc()).first()
+    if active:
+        return SyncResult(
+            success=True,
+            message=f"File commit sync already {active.status} ({active.items_synced}/{active.total_items} files)",
+            job_id=str(active.id)
+        )
     
-    # Get all unique repo + file path combinations from findings
-    findings_files = db.query(
+    # Unique file paths with findings, grouped by repository in SQL
+    repo_files: Dict = dict(db.query(
         models.Finding.repository_id,
-        models.Finding.file_path
+        func.array_agg(distinct(models.Finding.file_path))
     ).filter(
-        models.Finding.file_path.isnot(None)
-    ).distinct().all()
-    
-    # Group by repository
-    repo_files: dict = {}
-    for repo_id, file_path in findings_files:
-        if repo_id and file_path:
-            if repo_id not in repo_files:
-                repo_files[repo_id] = []
-            repo_files[repo_id].append(file_path)
+        models.Finding.repository_id.isnot(None),
+        models.Finding.file_path.isnot(None),
+        models.Finding.file_path != ''
+    ).group_by(models.Finding.repository_id))
     
     total_files = sum(len(files) for files in repo_files.values())
     
-    def sync_all_files_task():
+    job = models.SyncJob(job_type="files", status="queued", total_items=total_files)
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    
+    async def sync_all_files_task():
         """Background task to sync all file commits."""
-        db_session = SessionLocal()
+        # The preloaded repos are only read; keep them loaded across the
+        # per-repo upsert commits
+        db_session = SessionLocal(expire_on_commit=False)
         try:
+            await asyncio.to_thread(update_sync_job, db_session, job_id, status="running", started_at=datetime.utcnow())
             synced = 0
             failed = 0
+            repos = {
+                r.id: r for r in await asyncio.to_thread(
+                    db_session.query(models.Repository).filter(
+                        models.Repository.id.in_(list(repo_files.keys()))
+                    ).all
+                )
+            }
             for repo_id, file_paths in repo_files.items():
-                repo = db_session.query(models.Repository).filter(models.Repository.id == repo_id).first()
+                repo = repos.get(repo_id)
                 if not repo:
                     continue
-                for file_path in file_paths:
-                    try:
-                        result = sync_file_commit(db_session, repo, file_path)
-                        if result:
-                            synced += 1
-                        else:
-                            failed += 1
-                    except Exception as e:
-                        logger.warning(f"Failed to sync {repo.name}/{file_path}: {e}")
-                        failed += 1
+                try:
+                    repo_synced = await sync_file_commits_bulk(db_session, repo, file_paths)
+                except Exception as e:
+                    logger.warning(f"Failed to sync files for {repo.name}: {e}")
+                    repo_synced = 0
+                synced += repo_synced
+                failed += len(file_paths) - repo_synced
+                await asyncio.to_thread(update_sync_job, db_session, job_id, items_synced=synced, items_failed=failed)
+            await asyncio.to_thread(
+                update_sync_job, db_session, job_id, status="completed", completed_at=datetime.utcnow()
+            )
+            await asyncio.to_thread(refresh_finding_sync_counts, db_session)
             logger.info(f"File commit sync complete: {synced} synced, {failed} failed out of {total_files} total")
+        except Exception as e:
+            logger.error(f"File commit sync failed: {e}")
+            db_session.rollback()
+            await asyncio.to_thread(
+                update_sync_job, db_session, job_id,
+                status="failed", error_message=str(e), completed_at=datetime.utcnow()
+            )
         finally:
             db_session.close()
     
@@ -417,37 +1023,88 @@ def sync_all_files_for_findings(background_tasks: BackgroundTasks, db: Session =
     return SyncResult(
         success=True,
         message=f"Started syncing {total_files} files across {len(repo_files)} repositories in background",
-        files_synced=0  # Updates in background
+        files_synced=0,  # Updates in background
+        job_id=str(job_id)
     )
 
 
+@router.get("/sync-jobs/{job_id}", response_model=SyncJobStatus)
+def get_sync_job(job_id: str, db: Session = Depends(get_db)):
+    """Get the progress of a background sync job."""
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    job = db.query(models.SyncJob).filter(models.SyncJob.id == job_uuid).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return sync_job_status(job)
+
+
 @router.get("/sync-status")
-def get_sync_status(db: Session = Depends(get_db)):
-    """Get current sync status for repositories and files."""
-    # Count repos with GitHub metadata
-    repos_with_metadata = db.query(models.Repository).filter(
-        models.Repository.pushed_at.isnot(None)
-    ).count()
-    
-    total_repos = db.query(models.Repository).count()
+def get_sync_status(approximate: bool = False, db: Session = Depends(get_db)):
+    """Get current sync status for repositories and files.
     
-    # Count files with commit data
-    files_with_commits = db.query(models.FileCommit).count()
-    
-    # Count unique files in findings
-    total_finding_files = db.query(models.Finding.file_path).filter(
-        models.Finding.file_path.isnot(None)
-    ).distinct().count()
-    
-    # Count findings with file commit data
-    findings_with_file_data = db.query(models.Finding).join(
-        models.FileCommit,
-        (models.Finding.repository_id == models.FileCommit.repository_id) &
-        (models.Finding.file_path == models.FileCommit.file_path)
-    ).count()
-    
-    total_findings = db.query(models.Finding).count()
+    With approximate=true, table totals come from planner statistics and the
+    finding/file match counts from a materialized view refreshed after each
+    file sync job, so the call does not scan findings.
+    """
+    with _sync_status_compute_lock:
+        with _sync_status_cache_lock:
+            generation = _sync_status_generation
+            cached = _sync_status_cache.get((generation, approximate))
+        if cached is None:
+            cached = _compute_approximate_sync_status(db) if approximate else _compute_sync_status(db)
+            with _sync_status_cache_lock:
+                # Only cache if no sync write landed while computing
+                if generation == _sync_status_generation:
+                    _sync_status_cache[(generation, approximate)] = cached
     
+    # Job progress changes between cache generations; it is a single-row lookup
+    latest_job = db.query(models.SyncJob).filter(
+        models.SyncJob.job_type == "files"
+    ).order_by(models.SyncJob.created_at.desc()).first()
+    return {**cached, "file_sync_job": sync_job_status(latest_job) if latest_job else None}
+
+
+def _repo_sync_counts(db: Session) -> tuple:
+    """(repos with GitHub metadata, total repos) in one pass over repositories."""
+    return tuple(db.execute(select(
+        func.count(models.Repository.id).filter(models.Repository.pushed_at.isnot(None)),
+        func.count(models.Repository.id)
+    )).one())
+
+
+def _estimated_row_count(db: Session, model) -> int:
+    """Planner row estimate for model's table; an exact count if never analyzed."""
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": model.__tablename__}
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return db.execute(select(func.count()).select_from(model)).scalar()
+    return estimate
+
+
+def refresh_finding_sync_counts(db: Session) -> None:
+    """Refresh the materialized counts behind /sync-status?approximate=true."""
+    try:
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {FINDING_SYNC_COUNTS_VIEW}"))
+        db.commit()
+    except ProgrammingError:
+        # migrations/add_finding_sync_counts_view.sql not applied
+        db.rollback()
+
+
+def _sync_status_response(
+    repos_with_metadata: int,
+    total_repos: int,
+    total_finding_files: int,
+    files_with_commits: int,
+    total_findings: int,
+    findings_with_file_data: int
+) -> dict:
+    """Shape sync counts as the /sync-status response."""
     return {
         "repositories": {
             "total": total_repos,
@@ -466,3 +1123,57 @@ def get_sync_status(db: Session = Depends(get_db)):
         }
     }
 
+
+def _compute_sync_status(db: Session) -> dict:
+    """Aggregate repository, file and finding sync counts."""
+    repos_with_metadata, total_repos = _repo_sync_counts(db)
+    
+    # Finding and file counts in one pass over findings. The EXISTS probe is
+    # served by the (repository_id, file_path) unique index on file_commits.
+    has_file_commit = exists().where(
+        models.FileCommit.repository_id == models.Finding.repository_id,
+        models.FileCommit.file_path == models.Finding.file_path
+    )
+    files_with_commits_q = select(func.count(models.FileCommit.id)).scalar_subquery()
+    total_finding_files, findings_with_file_data, total_findings, files_with_commits = db.execute(select(
+        func.count(distinct(models.Finding.file_path)),
+        func.count(models.Finding.id).filter(has_file_commit),
+        func.count(models.Finding.id),
+        files_with_commits_q
+    )).one()
+    
+    return {
+        **_sync_status_response(
+            repos_with_metadata, total_repos, total_finding_files,
+            files_with_commits, total_findings, findings_with_file_data
+        ),
+        "approximate": False
+    }
+
+
+def _compute_approximate_sync_status(db: Session) -> dict:
+    """Sync counts from planner statistics and the materialized finding counts.
+    
+    Falls back to the exact counts until the view exists and has been filled.
+    """
+    try:
+        counts = db.execute(text(
+            f"SELECT total_finding_files, findings_with_file_data FROM {FINDING_SYNC_COUNTS_VIEW}"
+        )).one_or_none()
+    except ProgrammingError:
+        db.rollback()
+        counts = None
+    if counts is None:
+        return _compute_sync_status(db)
+    
+    # Repositories are few; their counts stay exact
+    repos_with_metadata, total_repos = _repo_sync_counts(db)
+    return {
+        **_sync_status_response(
+            repos_with_metadata, total_repos, counts.total_finding_files,
+            _estimated_row_count(db, models.FileCommit),
+            _estimated_row_count(db, models.Finding),
+            counts.findings_with_file_data
+        ),
+        "approximate": True
+    }
@@ -11,6 +11,15 @@ router = APIRouter(
     tags=["integrations"]
 )
 
+# Jira status name (lowercased) -> (internal status, resolution or None to keep).
+# This mapping would need to be customized based on the Jira workflow.
+_JIRA_STATUS_MAP = {
+    "done": ("resolved", "fixed"),
+    "resolved": ("resolved", "fixed"),
+    "closed": ("resolved", "fixed"),
+    "in progress": ("in_progress", None),
+}
+
 @router.post("/webhook")
 async def jira_webhook(request: Request, db: Session = Depends(get_db)):
     """Handle incoming webhooks from Jira."""
@@ -34,14 +43,12 @@ async def jira_webhook(request: Request, db: Session = Depends(get_db)):
             if finding:
                 logger.info(f"Updating finding {finding.id} status to {status}")
                 # Map Jira status to internal status
-                # This logic would need to be customized based on Jira workflow
-                if status.lower() in ["done", "resolved", "closed"]:
-                    finding.status = "resolved"
-                    finding.resolution = "fixed"
-                elif status.lower() in ["in progress"]:
-                    finding.status = "in_progress"
-                
-                db.commit()
+                mapped = _JIRA_STATUS_MAP.get((status or "").lower())
+                if mapped:
+                    finding.status, resolution = mapped
+                    if resolution:
+                        finding.resolution = resolution
+                    db.commit()
                 
         return {"status": "received"}
         
@@ -1,56 +1,198 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, raiseload, selectinload
+from sqlalchemy import and_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from typing import List, Dict, Any, Optional
-from ..database import get_db
+from ..database import get_db, get_async_db
 from .. import models
 from .. import models
+import orjson
+import threading
 import uuid
-from pydantic import BaseModel
+from cachetools import TTLCache
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
-import os
 
 router = APIRouter(
     prefix="/projects",
     tags=["projects"]
 )
 
-@router.get("/")
-async def get_projects(db: Session = Depends(get_db)):
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered by orjson.
+
+    orjson serializes datetimes natively; anything else it doesn't know, such as
+    asyncpg's UUID type, falls back to str().
+
+    The dict-returning endpoints below return it directly, skipping
+    jsonable_encoder. Endpoints with a response_model keep the default response
+    class so FastAPI can serialize them through Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str)
+
+
+# Lowest-priority rank that counts in "highest severity" roll-ups, on the
+# generated, case-insensitive findings.severity_rank column (critical=1 ...
+# low=4); info, warning and unknown severities never win
+SEVERITY_RANK_LOW = 4
+
+# Built responses for the project list, project details and contributors,
+# keyed by endpoint and arguments. They only move when a scan is ingested or
+# GitHub metadata is synced, so entries live for a minute. Metadata writes go
+# through this API and drop the cache directly; scans are ingested by the
+# scan worker process, so each entry also records the data version it was
+# built from and is ignored once a newer scan has completed.
+PROJECT_CACHE_TTL = 60
+_project_cache: TTLCache = TTLCache(maxsize=1024, ttl=PROJECT_CACHE_TTL)
+_project_cache_lock = threading.Lock()
+
+# Data version shared by all processes: the scan worker sets completed_at once
+# a scan's results are ingested (served by idx_scan_runs_completed_at)
+PROJECT_DATA_VERSION = select(func.max(models.ScanRun.completed_at))
+
+
+def invalidate_project_cache() -> None:
+    """Drop all cached project responses after a scan or metadata write."""
+    with _project_cache_lock:
+        _project_cache.clear()
+
+
+def _cached_project_response(key: tuple, version):
+    """Return a project response cached at this data version, or None."""
+    with _project_cache_lock:
+        entry = _project_cache.get(key)
+    if entry is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def _cache_project_response(key: tuple, version, value):
+    """Store a project response built at this data version and return it."""
+    with _project_cache_lock:
+        _project_cache[key] = (version, value)
+    return value
+
+
+# Finding types served by GET /projects/{id}/findings?type=...
+PROJECT_FINDING_TYPES = ('secret', 'sast', 'iac', 'oss')
+
+# Open findings of one type for a repository, selecting only the columns the
+# tabs return. Built once so requests only bind parameters and hit the
+# compiled statement cache.
+OPEN_FINDINGS_BY_TYPE = select(
+    models.Finding.finding_uuid,
+    models.Finding.title,
+    models.Finding.severity,
+    models.Finding.file_path,
+    models.Finding.line_start,
+    models.Finding.description,
+    models.Finding.created_at
+).where(
+    models.Finding.repository_id == bindparam("repository_id"),
+    models.Finding.finding_type == bindparam("finding_type"),
+    models.Finding.status == 'open'
+)
+
+# Same filter for tab badges that only need the number of findings
+OPEN_FINDINGS_COUNT_BY_TYPE = select(func.count()).select_from(models.Finding).where(
+    models.Finding.repository_id == bindparam("repository_id"),
+    models.Finding.finding_type == bindparam("finding_type"),
+    models.Finding.status == 'open'
+)
+
+
+async def _get_project(db: AsyncSession, project_id: str) -> Optional[models.Repository]:
+    """Look up a project by UUID, falling back to its name for name-based links.
+
+    UUIDs go through db.get(), which checks the identity map before querying.
+    """
+    try:
+        return await db.get(models.Repository, uuid.UUID(project_id))
+    except ValueError:
+        return (await db.execute(
+            select(models.Repository).where(models.Repository.name == project_id).limit(1)
+        )).scalars().first()
+
+
+async def _list_open_findings(
+    db: AsyncSession,
+    project_id: str,
+    finding_type: str,
+    count_only: bool = False
+) -> OrjsonResponse:
+    """Open findings of one type for a project, serialized for the findings tabs.
+
+    With count_only, returns {"count": n} without fetching any finding rows.
+    """
+    project = await _get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    params = {"repository_id": project.id, "finding_type": finding_type}
+    if count_only:
+        count = (await db.execute(OPEN_FINDINGS_COUNT_BY_TYPE, params)).scalar_one()
+        return OrjsonResponse({"count": count})
+
+    rows = await db.execute(OPEN_FINDINGS_BY_TYPE, params)
+
+    return OrjsonResponse([{
+        "id": finding_uuid,
+        "title": title,
+        "severity": severity,
+        "file_path": file_path,
+        "line": line_start,
+        "description": description,
+        "created_at": created_at
+    } for finding_uuid, title, severity, file_path, line_start, description, created_at in rows])
+
+@router.get("/", response_class=OrjsonResponse)
+async def get_projects(db: AsyncSession = Depends(get_async_db)):
     """Get a list of all projects with summary stats."""
-    projects = db.query(models.Repository).all()
+    version = (await db.execute(PROJECT_DATA_VERSION)).scalar()
+    cached = _cached_project_response(("list",), version)
+    if cached is not None:
+        return OrjsonResponse(cached)
+
+    projects = (await db.execute(select(models.Repository))).scalars().all()
+
+    # Per-repository aggregates, one grouped query each instead of queries per project.
+    # The highest open SAST severity is picked in SQL, keeping its stored value;
+    # info/unknown severities don't count.
+    top_sast_severity = func.array_agg(
+        aggregate_order_by(models.Finding.severity, models.Finding.severity_rank)
+    ).filter(and_(
+        models.Finding.finding_type == 'sast',
+        models.Finding.severity_rank <= SEVERITY_RANK_LOW
+    ))[1]
+    finding_stats_by_repo = {
+        repo_id: (open_findings, max_severity)
+        for repo_id, open_findings, max_severity in (await db.execute(select(
+            models.Finding.repository_id,
+            func.count(models.Finding.id),
+            top_sast_severity
+        ).where(
+            models.Finding.status == 'open'
+        ).group_by(models.Finding.repository_id))).all()
+    }
+
+    # Most recent commit date from contributors (fallback for pushed_at)
+    last_commit_by_repo = dict((await db.execute(select(
+        models.Contributor.repository_id,
+        func.max(models.Contributor.last_commit_at)
+    ).group_by(models.Contributor.repository_id))).all())
 
     results = []
     for p in projects:
-        open_findings = db.query(models.Finding).filter(
-            models.Finding.repository_id == p.id,
-            models.Finding.status == 'open'
-        ).count()
-
-        # Get the most recent commit date from contributors (fallback)
-        last_commit = db.query(func.max(models.Contributor.last_commit_at)).filter(
-            models.Contributor.repository_id == p.id
-        ).scalar()
-
-        # Get highest severity from SAST findings
-        severity_order = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1}
-        sast_findings = db.query(models.Finding).filter(
-            models.Finding.repository_id == p.id,
-            models.Finding.finding_type == 'sast',
-            models.Finding.status == 'open'
-        ).all()
-
-        max_severity = None
-        max_severity_value = 0
-        for finding in sast_findings:
-            severity = finding.severity.lower() if finding.severity else 'low'
-            severity_value = severity_order.get(severity, 0)
-            if severity_value > max_severity_value:
-                max_severity_value = severity_value
-                max_severity = finding.severity
+        open_findings, max_severity = finding_stats_by_repo.get(p.id, (0, None))
+        last_commit = last_commit_by_repo.get(p.id)
 
         results.append({
-            "id": str(p.id),
+            "id": p.id,
             "name": p.name,
             "description": p.description,
             "language": p.language or "Unknown",
@@ -70,30 +212,38 @@ async def get_projects(db: Session = Depends(get_db)):
             }
         })
 
-    return results
+    return OrjsonResponse(_cache_project_response(("list",), version, results))
 
-@router.get("/{project_id}")
-async def get_project_details(project_id: str, db: Session = Depends(get_db)):
+@router.get("/by-name/{name}", response_class=OrjsonResponse)
+async def get_project_details_by_name(name: str, db: AsyncSession = Depends(get_async_db)):
+    """Get basic details for a project by repository name."""
+    project_id = (await db.execute(
+        select(models.Repository.id).where(models.Repository.name == name).limit(1)
+    )).scalar()
+    if project_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await get_project_details(str(project_id), db)
+
+@router.get("/{project_id}", response_class=OrjsonResponse)
+async def get_project_details(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get basic details for a specific project."""
-    try:
-        # Try to parse UUID
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        # Fallback to name search if not a UUID (for convenience)
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
+    version = (await db.execute(PROJECT_DATA_VERSION)).scalar()
+    cached = _cached_project_response(("detail", project_id), version)
+    if cached is not None:
+        return OrjsonResponse(cached)
 
+    project = await _get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # Calculate aggregate stats
-    open_findings_count = db.query(models.Finding).filter(
+    open_findings_count = (await db.execute(select(func.count(models.Finding.id)).where(
         models.Finding.repository_id == project.id,
         models.Finding.status == 'open'
-    ).count()
+    ))).scalar_one()
     
-    return {
-        "id": str(project.id),
+    return OrjsonResponse(_cache_project_response(("detail", project_id), version, {
+        "id": project.id,
         "name": project.name,
         "full_name": project.full_name,
         "description": project.description,
@@ -122,63 +272,32 @@ async def get_project_details(project_id: str, db: Session = Depends(get_db)):
             "open_issues": project.open_issues_count or 0,
             "size_kb": project.size_kb or 0,
         }
-    }
+    }))
 
-@router.get("/{project_id}/secrets")
-async def get_project_secrets(project_id: str, db: Session = Depends(get_db)):
+@router.get("/{project_id}/findings", response_class=OrjsonResponse)
+async def get_project_findings(
+    project_id: str,
+    finding_type: str = Query(..., alias="type", description="One of: secret, sast, iac, oss"),
+    count_only: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get open findings of one type for a project."""
+    if finding_type not in PROJECT_FINDING_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid finding type. Must be one of: {', '.join(PROJECT_FINDING_TYPES)}"
+        )
+    return await _list_open_findings(db, project_id, finding_type, count_only)
+
+@router.get("/{project_id}/secrets", response_class=OrjsonResponse)
+async def get_project_secrets(project_id: str, count_only: bool = False, db: AsyncSession = Depends(get_async_db)):
     """Get secrets findings for a project."""
-    try:
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
-        
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await _list_open_findings(db, project_id, 'secret', count_only)
 
-    findings = db.query(models.Finding).filter(
-        models.Finding.repository_id == project.id,
-        models.Finding.finding_type == 'secret',
-        models.Finding.status == 'open'
-    ).all()
-
-    return [{
-        "id": str(f.finding_uuid),
-        "title": f.title,
-        "severity": f.severity,
-        "file_path": f.file_path,
-        "line": f.line_start,
-        "description": f.description,
-        "created_at": f.created_at
-    } for f in findings]
-
-@router.get("/{project_id}/sast")
-async def get_project_sast(project_id: str, db: Session = Depends(get_db)):
+@router.get("/{project_id}/sast", response_class=OrjsonResponse)
+async def get_project_sast(project_id: str, count_only: bool = False, db: AsyncSession = Depends(get_async_db)):
     """Get SAST (Semgrep/CodeQL) findings for a project."""
-    try:
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    findings = db.query(models.Finding).filter(
-        models.Finding.repository_id == project.id,
-        models.Finding.finding_type == 'sast',
-        models.Finding.status == 'open'
-    ).all()
-
-    return [{
-        "id": str(f.finding_uuid),
-        "title": f.title,
-        "severity": f.severity,
-        "file_path": f.file_path,
-        "line": f.line_start,
-        "description": f.description,
-        "created_at": f.created_at
-    } for f in findings]
+    return await _list_open_findings(db, project_id, 'sast', count_only)
 
 class FileWithSeverity(BaseModel):
     """File entry with security severity data."""
@@ -205,6 +324,10 @@ class ContributorSummary(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# Built once; validating the whole list in one call avoids per-row model construction
+_CONTRIBUTOR_SUMMARIES = TypeAdapter(List[ContributorSummary])
+
+
 class ContributorDetail(BaseModel):
     """Full contributor details for modal display."""
     id: str
@@ -262,11 +385,24 @@ def get_project_contributors(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid project ID format")
 
-    repo = db.query(models.Repository).filter(models.Repository.id == repo_uuid).first()
+    cache_key = ("contributors", repo_uuid, limit)
+    version = db.execute(PROJECT_DATA_VERSION).scalar()
+    cached = _cached_project_response(cache_key, version)
+    if cached is not None:
+        return cached
+
+    repo = db.query(models.Repository).options(
+        raiseload('*')
+    ).filter(models.Repository.id == repo_uuid).first()
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    contributors = db.query(models.Contributor).filter(
+    # The table only needs the stored file/folder summaries, never the JSON lists
+    contributors = db.query(models.Contributor).options(
+        defer(models.Contributor.files_contributed, raiseload=True),
+        defer(models.Contributor.folders_contributed, raiseload=True),
+        raiseload('*')
+    ).filter(
         models.Contributor.repository_id == repo_uuid
     ).order_by(models.Contributor.commits.desc()).limit(limit).all()
 
@@ -282,40 +418,29 @@ def get_project_contributors(
             bus_factor = i
             break
 
-    # Build summary responses
-    summaries = []
-    for c in contributors:
-        files = c.files_contributed or []
-
-        # Get highest severity
-        severities = [f.get('severity') for f in files if f.get('severity')]
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        highest = None
-        if severities:
-            highest = min(severities, key=lambda s: severity_order.get(s, 99))
-
-        summaries.append(ContributorSummary(
-            id=str(c.id),
-            name=c.name,
-            email=c.email,
-            github_username=c.github_username,
-            commits=c.commits,
-            commit_percentage=float(c.commit_percentage) if c.commit_percentage else None,
-            last_commit_at=c.last_commit_at,
-            languages=c.languages or [],
-            files_count=len(files),
-            folders_count=len(c.folders_contributed or []),
-            risk_score=c.risk_score or 0,
-            highest_severity=highest
-        ))
-
-    return ContributorsResponse(
+    # Build summary responses, validated in one pass
+    summaries = _CONTRIBUTOR_SUMMARIES.validate_python([{
+        "id": str(c.id),
+        "name": c.name,
+        "email": c.email,
+        "github_username": c.github_username,
+        "commits": c.commits,
+        "commit_percentage": float(c.commit_percentage) if c.commit_percentage else None,
+        "last_commit_at": c.last_commit_at,
+        "languages": c.languages or [],
+        "files_count": c.files_count or 0,
+        "folders_count": c.folders_count or 0,
+        "risk_score": c.risk_score or 0,
+        "highest_severity": c.highest_severity
+    } for c in contributors])
+
+    return _cache_project_response(cache_key, version, ContributorsResponse(
         total_contributors=len(contributors),
         total_commits=total_commits,
         bus_factor=bus_factor,
         team_ai_summary=None,  # Can be populated from repo-level AI analysis
         contributors=summaries
-    )
+    ))
 
 
 @router.get("/{project_id}/contributors/{contributor_id}", response_model=ContributorDetail)
@@ -331,7 +456,9 @@ def get_contributor_detail(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    contributor = db.query(models.Contributor).filter(
+    contributor = db.query(models.Contributor).options(
+        raiseload('*')
+    ).filter(
         models.Contributor.id == contrib_uuid,
         models.Contributor.repository_id == repo_uuid
     ).first()
@@ -341,11 +468,13 @@ def get_contributor_detail(
 
     files = contributor.files_contributed or []
 
-    # Count files by severity
-    critical_count = len([f for f in files if f.get('severity') == 'critical'])
-    high_count = len([f for f in files if f.get('severity') == 'high'])
-    medium_count = len([f for f in files if f.get('severity') == 'medium'])
-    low_count = len([f for f in files if f.get('severity') == 'low'])
+    # Count files by severity from the normalized contributor_files rows
+    severity_counts = dict(db.query(
+        models.ContributorFile.severity,
+        func.count(models.ContributorFile.id)
+    ).filter(
+        models.ContributorFile.contributor_id == contributor.id
+    ).group_by(models.ContributorFile.severity).all())
 
     return ContributorDetail(
         id=str(contributor.id),
@@ -360,10 +489,10 @@ def get_contributor_detail(
         folders_contributed=contributor.folders_contributed or [],
         risk_score=contributor.risk_score or 0,
         ai_summary=contributor.ai_summary,
-        critical_files_count=critical_count,
-        high_files_count=high_count,
-        medium_files_count=medium_count,
-        low_files_count=low_count
+        critical_files_count=severity_counts.get('critical', 0),
+        high_files_count=severity_counts.get('high', 0),
+        medium_files_count=severity_counts.get('medium', 0),
+        low_files_count=severity_counts.get('low', 0)
     )
 
 class LanguageStatResponse(BaseModel):
@@ -384,39 +513,28 @@ def get_project_languages(project_id: str, db: Session = Depends(get_db)):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    repo = db.query(models.Repository).filter(models.Repository.id == uuid_obj).first()
+    # Language stats are loaded up front; any other lazy load is a bug
+    repo = db.query(models.Repository).options(
+        selectinload(models.Repository.languages),
+        raiseload('*')
+    ).filter(models.Repository.id == uuid_obj).first()
     if not repo:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Get all findings for this repo
-    findings = db.query(models.Finding).filter(
+    # Count open findings per (language, severity) on the generated column
+    findings_by_lang = {}  # lang -> {severity -> count}
+    for lang, severity, count in db.query(
+        models.Finding.language,
+        models.Finding.severity,
+        func.count(models.Finding.id)
+    ).filter(
         models.Finding.repository_id == repo.id,
         models.Finding.status == 'open'
-    ).all()
-
-    # Map extensions to languages (simplified map for now)
-    # In a real app, we might use a library or DB table for this
-    ext_map = {
-        '.py': 'Python', '.js': 'JavaScript', '.ts': 'TypeScript', '.tsx': 'TypeScript',
-        '.jsx': 'JavaScript', '.go': 'Go', '.java': 'Java', '.c': 'C', '.cpp': 'C++',
-        '.rb': 'Ruby', '.php': 'PHP', '.rs': 'Rust', '.html': 'HTML', '.css': 'CSS',
-        '.sh': 'Shell', '.yml': 'YAML', '.yaml': 'YAML', '.json': 'JSON', '.md': 'Markdown',
-        '.sql': 'SQL', '.dockerfile': 'Docker', '.tf': 'HCL'
-    }
-
-    # Aggregate findings by language
-    findings_by_lang = {} # lang -> {severity -> count}
-    
-    for f in findings:
-        ext = os.path.splitext(f.file_path)[1].lower() if f.file_path else ""
-        lang = ext_map.get(ext, "Other")
-        
-        if lang not in findings_by_lang:
-            findings_by_lang[lang] = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-            
-        severity = f.severity.lower()
-        if severity in findings_by_lang[lang]:
-            findings_by_lang[lang][severity] += 1
+    ).group_by(models.Finding.language, models.Finding.severity).all():
+        counts = findings_by_lang.setdefault(lang, {"critical": 0, "high": 0, "medium": 0, "low": 0})
+        severity = severity.lower() if severity else ""
+        if severity in counts:
+            counts[severity] += count
 
     # Combine with stored language stats
     results = []
@@ -461,68 +579,51 @@ def get_project_dependencies(project_id: str, db: Session = Depends(get_db)):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    repo = db.query(models.Repository).filter(models.Repository.id == uuid_obj).first()
+    repo = db.query(models.Repository).options(
+        raiseload('*')
+    ).filter(models.Repository.id == uuid_obj).first()
     if not repo:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # 1. Fetch all dependencies
-    dependencies = repo.dependencies
-    
-    # 2. Fetch all findings for this repo that are related to dependencies
-    # We assume findings with package_name are dependency findings
-    findings = db.query(models.Finding).filter(
-        models.Finding.repository_id == repo.id,
-        models.Finding.package_name.isnot(None)
+    # Dependency findings match on (name, version) and cached analyses on
+    # (name, version, manager); count and rank both in one grouped query,
+    # keeping the highest-ranked finding's stored severity. Findings without
+    # a severity rank last; if none has one, the dependency is reported "low".
+    max_severity = func.array_agg(
+        aggregate_order_by(models.Finding.severity, models.Finding.severity_rank)
+    )[1]
+
+    rows = db.query(
+        models.Dependency,
+        func.count(models.Finding.id),
+        max_severity,
+        models.ComponentAnalysis
+    ).outerjoin(
+        models.Finding,
+        and_(
+            models.Finding.repository_id == repo.id,
+            models.Finding.package_name == models.Dependency.name,
+            models.Finding.package_version.is_not_distinct_from(models.Dependency.version)
+        )
+    ).outerjoin(
+        models.ComponentAnalysis,
+        and_(
+            models.ComponentAnalysis.package_name == models.Dependency.name,
+            models.ComponentAnalysis.version == models.Dependency.version,
+            models.ComponentAnalysis.package_manager == models.Dependency.package_manager
+        )
+    ).filter(
+        models.Dependency.repository_id == repo.id
+    ).group_by(
+        models.Dependency.id, models.ComponentAnalysis.id
+    ).order_by(
+        models.Dependency.name, models.Dependency.version
     ).all()
-    
-    # Map findings to dependencies (name + version)
-    findings_map = {} # (name, version) -> [findings]
-    for f in findings:
-        key = (f.package_name, f.package_version)
-        if key not in findings_map:
-            findings_map[key] = []
-        findings_map[key].append(f)
-        
-    # 3. Fetch all component analyses
-    # We can't easily filter by list of tuples in SQL without complex query, 
-    # so we might fetch all relevant ones or just fetch individually if list is small.
-    # For now, let's fetch all analyses that match any dependency name in this repo
-    dep_names = [d.name for d in dependencies]
-    analyses = db.query(models.ComponentAnalysis).filter(
-        models.ComponentAnalysis.package_name.in_(dep_names)
-    ).all()
-    
-    analysis_map = {} # (name, version, manager) -> analysis
-    for a in analyses:
-        # Normalize manager if needed, but for now assume exact match
-        key = (a.package_name, a.version, a.package_manager)
-        analysis_map[key] = a
 
     results = []
-    for d in dependencies:
-        # Find matching findings
-        # Try exact match first
-        related_findings = findings_map.get((d.name, d.version), [])
-        
-        # Calculate max severity
-        severity_order = {"critical": 4, "high": 3, "medium": 2, "low": 1, "info": 0, "safe": -1}
-        max_sev = "Safe"
-        max_score = -1
-        
-        for f in related_findings:
-            s = f.severity.lower() if f.severity else "low"
-            score = severity_order.get(s, 0)
-            if score > max_score:
-                max_score = score
-                max_sev = f.severity
-        
-        if not related_findings and max_score == -1:
-             max_sev = "Safe"
-
-        # Find matching analysis
-        # We need to be careful with package_manager names matching
+    for d, vulnerability_count, max_sev, analysis in rows:
+        # Analysis matching is exact on package_manager names:
         # Syft might say 'npm', we store 'npm'.
-        analysis = analysis_map.get((d.name, d.version, d.package_manager))
         analysis_data = None
         if analysis:
             analysis_data = {
@@ -543,91 +644,48 @@ def get_project_dependencies(project_id: str, db: Session = Depends(get_db)):
             license=d.license or "Unknown",
             locations=d.locations if d.locations else [],
             source=d.source,
-            vulnerability_count=len(related_findings),
-            max_severity=max_sev,
+            vulnerability_count=vulnerability_count,
+            max_severity=max_sev or ("low" if vulnerability_count else "Safe"),
             ai_analysis=analysis_data
         ))
         
     return results
 
-@router.get("/{project_id}/terraform")
-async def get_project_terraform(project_id: str, db: Session = Depends(get_db)):
+@router.get("/{project_id}/terraform", response_class=OrjsonResponse)
+async def get_project_terraform(project_id: str, count_only: bool = False, db: AsyncSession = Depends(get_async_db)):
     """Get Terraform/IaC findings for a project."""
-    try:
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    findings = db.query(models.Finding).filter(
-        models.Finding.repository_id == project.id,
-        models.Finding.finding_type == 'iac',
-        models.Finding.status == 'open'
-    ).all()
+    return await _list_open_findings(db, project_id, 'iac', count_only)
 
-    return [{
-        "id": str(f.finding_uuid),
-        "title": f.title,
-        "severity": f.severity,
-        "file_path": f.file_path,
-        "line": f.line_start,
-        "description": f.description,
-        "created_at": f.created_at
-    } for f in findings]
-
-@router.get("/{project_id}/oss")
-async def get_project_oss(project_id: str, db: Session = Depends(get_db)):
+@router.get("/{project_id}/oss", response_class=OrjsonResponse)
+async def get_project_oss(project_id: str, count_only: bool = False, db: AsyncSession = Depends(get_async_db)):
     """Get OSS/Dependency findings for a project."""
-    try:
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await _list_open_findings(db, project_id, 'oss', count_only)
 
-    findings = db.query(models.Finding).filter(
-        models.Finding.repository_id == project.id,
-        models.Finding.finding_type == 'oss',
-        models.Finding.status == 'open'
-    ).all()
-
-    return [{
-        "id": str(f.finding_uuid),
-        "title": f.title,
-        "severity": f.severity,
-        "file_path": f.file_path,
-        "line": f.line_start,
-        "description": f.description,
-        "created_at": f.created_at
-    } for f in findings]
-
-@router.get("/{project_id}/runs")
-async def get_project_runs(project_id: str, db: Session = Depends(get_db)):
+@router.get("/{project_id}/runs", response_class=OrjsonResponse)
+async def get_project_runs(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get scan runs for a project."""
-    try:
-        p_uuid = uuid.UUID(project_id)
-        project = db.query(models.Repository).filter(models.Repository.id == p_uuid).first()
-    except ValueError:
-        project = db.query(models.Repository).filter(models.Repository.name == project_id).first()
-
+    project = await _get_project(db, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    runs = db.query(models.ScanRun).filter(
+    runs = await db.execute(select(
+        models.ScanRun.id,
+        models.ScanRun.scan_type,
+        models.ScanRun.status,
+        models.ScanRun.findings_count,
+        models.ScanRun.created_at,
+        models.ScanRun.completed_at,
+        models.ScanRun.duration_seconds
+    ).where(
         models.ScanRun.repository_id == project.id
-    ).order_by(models.ScanRun.created_at.desc()).limit(50).all()
-
-    return [{
-        "id": str(r.id),
-        "scan_type": r.scan_type,
-        "status": r.status,
-        "findings_count": r.findings_count,
-        "created_at": r.created_at,
-        "completed_at": r.completed_at,
-        "duration_seconds": r.duration_seconds
-    } for r in runs]
+    ).order_by(models.ScanRun.created_at.desc()).limit(50))
+
+    return OrjsonResponse([{
+        "id": run_id,
+        "scan_type": scan_type,
+        "status": status,
+        "findings_count": findings_count,
+        "created_at": created_at,
+        "completed_at": completed_at,
+        "duration_seconds": duration_seconds
+    } for run_id, scan_type, status, findings_count, created_at, completed_at, duration_seconds in runs])
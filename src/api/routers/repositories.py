@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from .. import models
-from pydantic import BaseModel
+from .projects import invalidate_project_cache
+from pydantic import BaseModel, field_validator
 from datetime import datetime
 from typing import Optional
 
@@ -40,14 +41,16 @@ class Repository(RepositoryBase):
 
     model_config = {"from_attributes": True}
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def _stringify_id(cls, value):
+        # The ORM hands us a uuid.UUID; never mutate the instance to convert it
+        return str(value)
+
 @router.get("/", response_model=List[Repository])
 def read_repositories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all repositories."""
-    repos = db.query(models.Repository).offset(skip).limit(limit).all()
-    # Convert UUIDs to strings for Pydantic
-    for repo in repos:
-        repo.id = str(repo.id)
-    return repos
+    return db.query(models.Repository).offset(skip).limit(limit).all()
 
 @router.post("/", response_model=Repository)
 def create_repository(repo: RepositoryCreate, db: Session = Depends(get_db)):
@@ -60,7 +63,7 @@ def create_repository(repo: RepositoryCreate, db: Session = Depends(get_db)):
     db.add(new_repo)
     db.commit()
     db.refresh(new_repo)
-    new_repo.id = str(new_repo.id)
+    invalidate_project_cache()
     return new_repo
 
 @router.get("/{repo_name}", response_model=Repository)
@@ -69,5 +72,4 @@ def read_repository(repo_name: str, db: Session = Depends(get_db)):
     repo = db.query(models.Repository).filter(models.Repository.name == repo_name).first()
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
-    repo.id = str(repo.id)
     return repo
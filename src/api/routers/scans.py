@@ -1,15 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy import update as sql_update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import deque
+import asyncio
+import codecs
+import os
 import uuid
-from ..database import get_db
+from ..database import SessionLocal, get_async_db
 from .. import models
+from .projects import OrjsonResponse
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Scanner output of each run, one file per scan id
+SCAN_LOG_DIR = os.environ.get("SCAN_LOG_DIR", "/app/vulnerability_reports/scan_logs")
+# Output lines kept for ScanRun.error_message when a scan fails
+SCAN_ERROR_TAIL_LINES = 200
+# Scanner output is read in chunks of this size, so no line is too long to
+# read; the last SCAN_ERROR_TAIL_CHUNKS chunks are kept for the error message
+SCAN_OUTPUT_CHUNK_SIZE = 64 * 1024
+SCAN_ERROR_TAIL_CHUNKS = 4
+# A running scan refreshes heartbeat_at this often; one whose heartbeat is
+# older than SCAN_STALE_AFTER lost its worker (crash, OOM kill, SIGTERM) and
+# is failed by the next worker poll
+SCAN_HEARTBEAT_SECONDS = 60
+SCAN_STALE_AFTER = timedelta(minutes=10)
+# When a scan last showed signs of life (rows from before heartbeat_at existed
+# fall back to started_at)
+SCAN_LAST_SEEN = func.coalesce(models.ScanRun.heartbeat_at, models.ScanRun.started_at, models.ScanRun.created_at)
+# Queued plus running scans accepted before POST /scans answers 503; defaults
+# to twice the scan worker's default concurrency
+MAX_ACTIVE_SCANS = int(os.environ.get("MAX_ACTIVE_SCANS", "4"))
+SCAN_RETRY_AFTER_SECONDS = 60
+# Serializes admission across API processes for the rest of the transaction
+_ADMIT_SCAN_LOCK = text("SELECT pg_advisory_xact_lock(hashtext('scan_admission'))")
+
 router = APIRouter(
     prefix="/scans",
     tags=["scans"]
@@ -26,19 +56,39 @@ class ScanResponse(BaseModel):
     status: str
     message: str
 
-def run_scan_background(scan_id: str, repo_name: str, scan_type: str, scanners: List[str] = None, finding_ids: List[str] = None):
+def _update_scan_run(scan_id: str, **values):
+    """Set columns on a scan run in its own short-lived session.
+
+    The scan itself can take minutes, so no connection is held while it runs.
+    """
+    with SessionLocal() as db:
+        db.execute(sql_update(models.ScanRun).where(models.ScanRun.id == scan_id).values(**values))
+        db.commit()
+
+async def _heartbeat(scan_id: str):
+    """Refresh the scan's heartbeat_at until cancelled."""
+    while True:
+        await asyncio.sleep(SCAN_HEARTBEAT_SECONDS)
+        try:
+            await asyncio.to_thread(_update_scan_run, scan_id, heartbeat_at=datetime.utcnow())
+        except Exception as e:
+            logger.warning(f"Failed to record heartbeat for scan {scan_id}: {e}")
+
+async def run_scan_background(scan_id: str, repo_name: str, scan_type: str, scanners: List[str] = None, finding_ids: List[str] = None):
     """
-    Background task to execute the scan.
+    Execute a queued scan; called by the scan worker (src/api/scan_worker.py).
+
+    The scanner's output is streamed to SCAN_LOG_DIR/<scan_id>.log rather than
+    buffered in memory; only its last lines are kept for the error message.
+    heartbeat_at is refreshed while the scan and its ingestion run.
     """
     logger.info(f"Starting scan {scan_id} for {repo_name} (Type: {scan_type}, Scanners: {scanners})")
     
-    db = next(get_db())
-    scan_run = db.query(models.ScanRun).filter(models.ScanRun.id == scan_id).first()
-    
+    heartbeat = None
+    process = None
     try:
-        if scan_run:
-            scan_run.status = "running"
-            db.commit()
+        _update_scan_run(scan_id, status="running", heartbeat_at=datetime.utcnow())
+        heartbeat = asyncio.create_task(_heartbeat(scan_id))
 
         # Build command
         cmd = ["python3", "scan_repos.py", "--repo", repo_name, "--no-ai-agent"]
@@ -47,27 +97,35 @@ def run_scan_background(scan_id: str, repo_name: str, scan_type: str, scanners:
             cmd.extend(["--scanners", ",".join(scanners)])
             
         # Execute scan
-        import subprocess
-        process = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
+        os.makedirs(SCAN_LOG_DIR, exist_ok=True)
+        log_path = os.path.join(SCAN_LOG_DIR, f"{scan_id}.log")
+        output_tail = deque(maxlen=SCAN_ERROR_TAIL_CHUNKS)
+        # Keeps multi-byte characters split across chunks intact
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,  # one pipe, so neither can fill up unread
             cwd="/app" # Assuming running in container
         )
+        with open(log_path, "w") as log_file:
+            while chunk := await process.stdout.read(SCAN_OUTPUT_CHUNK_SIZE):
+                text_chunk = decoder.decode(chunk)
+                log_file.write(text_chunk)
+                output_tail.append(text_chunk)
+            output_tail.append(decoder.decode(b"", final=True))
+        await process.wait()
         
         if process.returncode != 0:
-            logger.error(f"Scan failed: {process.stderr}")
-            if scan_run:
-                scan_run.status = "failed"
-                scan_run.error_message = process.stderr
-                db.commit()
+            output = "".join("".join(output_tail).splitlines(keepends=True)[-SCAN_ERROR_TAIL_LINES:])
+            logger.error(f"Scan failed (full output in {log_path}): {output}")
+            _update_scan_run(scan_id, status="failed", error_message=output)
             return
 
         # Ingest results
         try:
             # Import here to avoid circular imports
             import sys
-            import os
             sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
             from ingest_scans import ingest_single_repo
             
@@ -79,63 +137,88 @@ def run_scan_background(scan_id: str, repo_name: str, scan_type: str, scanners:
             safe_repo_name = "".join(c if c.isalnum() or c in '._-' else '_' for c in repo_name)
             report_dir = f"/app/vulnerability_reports/{safe_repo_name}"
             
-            ingest_single_repo(repo_name, report_dir)
+            # In a thread so the heartbeat keeps running during long ingests
+            await asyncio.to_thread(ingest_single_repo, repo_name, report_dir)
             
-            if scan_run:
-                scan_run.status = "completed"
-                scan_run.completed_at = datetime.utcnow()
-                db.commit()
+            # completed_at is also the API's signal that project data changed
+            # (projects.PROJECT_DATA_VERSION); this process has no cache to clear
+            _update_scan_run(scan_id, status="completed", completed_at=datetime.utcnow())
                 
         except Exception as e:
             logger.error(f"Ingestion failed: {e}")
-            if scan_run:
-                scan_run.status = "failed"
-                scan_run.error_message = f"Scan succeeded but ingestion failed: {e}"
-                db.commit()
+            _update_scan_run(scan_id, status="failed", error_message=f"Scan succeeded but ingestion failed: {e}")
 
     except Exception as e:
         logger.error(f"Scan execution failed: {e}")
-        if scan_run:
-            scan_run.status = "failed"
-            scan_run.error_message = str(e)
-            db.commit()
+        _update_scan_run(scan_id, status="failed", error_message=str(e))
     finally:
-        db.close()
+        if heartbeat:
+            heartbeat.cancel()
+        # Never leave the scanner running unsupervised, e.g. after a failure
+        # while reading its output
+        if process and process.returncode is None:
+            process.kill()
+            await process.wait()
 
 @router.post("/", response_model=ScanResponse)
 async def trigger_scan(
     request: ScanRequest, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Trigger a new security scan."""
+    """Trigger a new security scan.
+
+    The scan is only queued here; a scan worker (src/api/scan_worker.py) picks
+    it up and runs it outside the API process. Answers 503 once
+    MAX_ACTIVE_SCANS scans are already queued or running.
+    """
     # Verify repo exists
-    repo = db.query(models.Repository).filter(models.Repository.name == request.repo_name).first()
-    if not repo:
+    repo_id = (await db.execute(
+        select(models.Repository.id).where(models.Repository.name == request.repo_name)
+    )).scalar_one_or_none()
+    if not repo_id:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    # Admission control: refuse new scans while the workers are saturated
+    # rather than letting the queue grow without bound
+    await db.execute(_ADMIT_SCAN_LOCK)
+    # Running scans that stopped sending heartbeats lost their worker and are
+    # about to be failed by the next worker poll; they don't hold a slot
+    active_scans = (await db.execute(
+        select(func.count()).select_from(models.ScanRun)
+        .where(or_(
+            models.ScanRun.status == "queued",
+            and_(
+                models.ScanRun.status == "running",
+                SCAN_LAST_SEEN >= datetime.utcnow() - SCAN_STALE_AFTER
+            )
+        ))
+    )).scalar_one()
+    if active_scans >= MAX_ACTIVE_SCANS:
+        await db.rollback()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Too many scans in progress ({active_scans}); try again later",
+            headers={"Retry-After": str(SCAN_RETRY_AFTER_SECONDS)}
+        )
+
     # Create Scan Run record
     scan_id = uuid.uuid4()
     scan_run = models.ScanRun(
         id=scan_id,
-        repository_id=repo.id,
+        repository_id=repo_id,
         scan_type=request.scan_type,
         status="queued",
         triggered_by="api",
-        started_at=datetime.utcnow()
+        started_at=datetime.utcnow(),
+        # Everything the worker needs to run the scan
+        scan_config={
+            "repo_name": request.repo_name,
+            "scanners": request.scanners,
+            "finding_ids": request.finding_ids
+        }
     )
     db.add(scan_run)
-    db.commit()
-
-    # Queue the scan
-    background_tasks.add_task(
-        run_scan_background, 
-        str(scan_id), 
-        request.repo_name, 
-        request.scan_type, 
-        request.scanners,
-        request.finding_ids
-    )
+    await db.commit()
 
     return ScanResponse(
         scan_id=str(scan_id),
@@ -143,10 +226,15 @@ async def trigger_scan(
         message=f"{request.scan_type.capitalize()} scan initiated for {request.repo_name}"
     )
 
-@router.get("/{scan_id}")
-async def get_scan_status(scan_id: str, db: Session = Depends(get_db)):
+@router.get("/{scan_id}", response_class=OrjsonResponse)
+async def get_scan_status(scan_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get the status of a scan."""
-    scan = db.query(models.ScanRun).filter(models.ScanRun.id == scan_id).first()
+    try:
+        scan_uuid = uuid.UUID(scan_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format")
+
+    scan = await db.get(models.ScanRun, scan_uuid)
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
     
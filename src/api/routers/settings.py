@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
+from http.cookiejar import DefaultCookiePolicy
+import asyncio
 import os
 import requests
-from ..database import get_db
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from ..database import get_async_db
 from .. import models
 
 router = APIRouter(
@@ -12,6 +18,14 @@ router = APIRouter(
     tags=["settings"]
 )
 
+# Shared by the verify endpoints so repeated checks reuse keep-alive
+# connections instead of a new TCP/TLS handshake each time. Cookies are never
+# stored: a session cookie from one verification must not authenticate the next.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_http.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+_http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
 class SettingsUpdate(BaseModel):
     openai_api_key: Optional[str] = None
     jira_api_token: Optional[str] = None
@@ -23,8 +37,8 @@ class VerifyRequest(BaseModel):
     url: Optional[str] = None
     email: Optional[str] = None
 
-def update_env_file(key: str, value: str):
-    """Update or add a key-value pair in the .env file."""
+def update_env_file(updates: Dict[str, str]):
+    """Update or add key-value pairs in the .env file with a single read and write."""
     env_path = "/app/.env"
     if not os.path.exists(env_path):
         # Try local path if not in container
@@ -36,19 +50,19 @@ def update_env_file(key: str, value: str):
             with open(env_path, "r") as f:
                 lines = f.readlines()
         
-        key_found = False
+        pending = dict(updates)
         new_lines = []
         for line in lines:
-            if line.startswith(f"{key}="):
-                new_lines.append(f"{key}={value}\n")
-                key_found = True
+            key = line.split("=", 1)[0] if "=" in line else None
+            if key in pending:
+                new_lines.append(f"{key}={pending.pop(key)}\n")
             else:
                 new_lines.append(line)
         
-        if not key_found:
+        if pending:
             if new_lines and not new_lines[-1].endswith("\n"):
                 new_lines.append("\n")
-            new_lines.append(f"{key}={value}\n")
+            new_lines.extend(f"{key}={value}\n" for key, value in pending.items())
             
         with open(env_path, "w") as f:
             f.writelines(new_lines)
@@ -57,41 +71,42 @@ def update_env_file(key: str, value: str):
         print(f"Failed to update .env: {e}")
 
 @router.get("/")
-def get_settings(db: Session = Depends(get_db)):
+async def get_settings(db: AsyncSession = Depends(get_async_db)):
     """Get current settings."""
-    configs = db.query(models.SystemConfig).all()
-    settings = {}
-    for config in configs:
-        settings[config.key] = config.value
-    return settings
+    rows = await db.execute(select(models.SystemConfig.key, models.SystemConfig.value))
+    return {key: value for key, value in rows}
 
 @router.post("/")
-def save_settings(settings: SettingsUpdate, db: Session = Depends(get_db)):
+async def save_settings(settings: SettingsUpdate, db: AsyncSession = Depends(get_async_db)):
     """Save settings to DB and .env."""
     updates = {
-        "OPENAI_API_KEY": settings.openai_api_key,
-        "JIRA_API_TOKEN": settings.jira_api_token,
-        "JIRA_URL": settings.jira_url,
-        "JIRA_EMAIL": settings.jira_email
+        key: value
+        for key, value in {
+            "OPENAI_API_KEY": settings.openai_api_key,
+            "JIRA_API_TOKEN": settings.jira_api_token,
+            "JIRA_URL": settings.jira_url,
+            "JIRA_EMAIL": settings.jira_email
+        }.items()
+        if value is not None
     }
     
-    for key, value in updates.items():
-        if value is not None:
-            # Update DB
-            config = db.query(models.SystemConfig).filter(models.SystemConfig.key == key).first()
-            if not config:
-                config = models.SystemConfig(key=key, value=value)
-                db.add(config)
-            else:
-                config.value = value
-            
-            # Update .env
-            update_env_file(key, value)
-            
-            # Update current process env (for immediate use)
-            os.environ[key] = value
+    if updates:
+        # Update DB: one upsert for all keys
+        stmt = pg_insert(models.SystemConfig).values(
+            [{"key": key, "value": value} for key, value in updates.items()]
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.SystemConfig.key],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()}
+        ))
+        await db.commit()
+
+        # Only once the DB has accepted the values: update .env (one rewrite
+        # for all keys, off the event loop) and the current process env (for
+        # immediate use)
+        await asyncio.to_thread(update_env_file, updates)
+        os.environ.update(updates)
 
-    db.commit()
     return {"status": "success", "message": "Settings saved"}
 
 @router.post("/verify/openai")
@@ -100,7 +115,7 @@ def verify_openai(req: VerifyRequest):
     try:
         headers = {"Authorization": f"Bearer {req.token}"}
         # List models is a cheap/free way to verify
-        response = requests.get("https://api.openai.com/v1/models", headers=headers, timeout=10)
+        response = _http.get("https://api.openai.com/v1/models", headers=headers, timeout=10)
         if response.status_code == 200:
             return {"valid": True, "message": "OpenAI API Key is valid"}
         else:
@@ -116,13 +131,11 @@ def verify_jira(req: VerifyRequest):
         
     try:
         # Jira Cloud API uses Basic Auth with email and API token
-        from requests.auth import HTTPBasicAuth
-        
         api_url = f"{req.url.rstrip('/')}/rest/api/3/myself"
         auth = HTTPBasicAuth(req.email, req.token)
         headers = {"Accept": "application/json"}
         
-        response = requests.get(api_url, auth=auth, headers=headers, timeout=10)
+        response = _http.get(api_url, auth=auth, headers=headers, timeout=10)
         
         if response.status_code == 200:
             user_data = response.json()
@@ -0,0 +1,125 @@
+"""
+Scan worker: runs queued scans outside the API process.
+
+POST /scans only records a ScanRun with status "queued" and its parameters in
+scan_config; this worker claims queued runs from Postgres (FOR UPDATE SKIP
+LOCKED, so any number of workers can share the queue) and executes them with
+run_scan_background. Queued scans survive API restarts and scale by starting
+more workers. Running scans send a heartbeat; runs whose worker died stop
+sending it and are failed by the next poll of any worker, including one
+starting up.
+
+Run with:
+    python -m src.api.scan_worker
+"""
+import asyncio
+import logging
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy import update as sql_update
+
+from . import models
+from .database import SessionLocal
+from .routers.scans import SCAN_LAST_SEEN, SCAN_STALE_AFTER, run_scan_background
+
+logger = logging.getLogger(__name__)
+
+SCAN_WORKER_CONCURRENCY = int(os.environ.get("SCAN_WORKER_CONCURRENCY", "2"))
+SCAN_WORKER_POLL_SECONDS = float(os.environ.get("SCAN_WORKER_POLL_SECONDS", "5"))
+
+
+def fail_stale_scans() -> int:
+    """Fail running scans whose worker stopped sending heartbeats; returns how many."""
+    with SessionLocal() as db:
+        result = db.execute(
+            sql_update(models.ScanRun)
+            .where(
+                models.ScanRun.status == "running",
+                SCAN_LAST_SEEN < datetime.utcnow() - SCAN_STALE_AFTER
+            )
+            .values(status="failed", error_message="Scan worker stopped while the scan was running")
+        )
+        db.commit()
+    if result.rowcount:
+        logger.warning(f"Failed {result.rowcount} scan(s) orphaned by a stopped worker")
+    return result.rowcount
+
+
+def claim_next_scan() -> Optional[dict]:
+    """Mark the oldest queued scan as running and return its parameters, or None if the queue is empty."""
+    fail_stale_scans()
+    with SessionLocal() as db:
+        while True:
+            scan_run = db.execute(
+                select(models.ScanRun)
+                .where(models.ScanRun.status == "queued")
+                .order_by(models.ScanRun.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalars().first()
+            if scan_run is None:
+                return None
+
+            config = scan_run.scan_config or {}
+            repo_name = config.get("repo_name") or (scan_run.repository.name if scan_run.repository else None)
+            if not repo_name:
+                scan_run.status = "failed"
+                scan_run.error_message = "Queued scan has no repository to scan"
+                db.commit()
+                continue
+
+            scan_run.status = "running"
+            scan_run.heartbeat_at = datetime.utcnow()
+            db.commit()
+            return {
+                "scan_id": str(scan_run.id),
+                "repo_name": repo_name,
+                "scan_type": scan_run.scan_type,
+                "scanners": config.get("scanners"),
+                "finding_ids": config.get("finding_ids"),
+            }
+
+
+def _work(stop: threading.Event) -> None:
+    """Run queued scans one at a time until stop is set.
+
+    Each scan gets its own event loop in this thread, which it spends awaiting
+    the scanner subprocess.
+    """
+    while not stop.is_set():
+        try:
+            job = claim_next_scan()
+        except Exception as e:
+            logger.error(f"Failed to claim a queued scan: {e}")
+            job = None
+
+        if job is None:
+            stop.wait(SCAN_WORKER_POLL_SECONDS)
+            continue
+        asyncio.run(run_scan_background(**job))
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    logger.info(f"Scan worker started (concurrency={SCAN_WORKER_CONCURRENCY})")
+    with ThreadPoolExecutor(max_workers=SCAN_WORKER_CONCURRENCY) as pool:
+        for _ in range(SCAN_WORKER_CONCURRENCY):
+            pool.submit(_work, stop)
+    logger.info("Scan worker stopped")
+
+
+if __name__ == "__main__":
+    main()
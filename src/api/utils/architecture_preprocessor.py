@@ -7,16 +7,82 @@ Multi-stage pipeline that:
 3. Produces structured JSON for accurate diagram generation
 """
 
-import json
+import asyncio
+import copy
+import hashlib
 import logging
+import re
+import threading
+import weakref
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
+from cachetools import TTLCache
+import orjson
 
 from .code_extractors import extract_all
 from .repo_context import get_repo_context
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on summarization calls in flight across all preprocess() runs,
+# so overlapping architecture requests stay within the provider's rate limits
+MAX_CONCURRENT_AI_CALLS = 4
+# One semaphore per event loop: asyncio primitives bind to the loop that first
+# uses them, and worker threads each run their own loop via asyncio.run()
+_ai_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_ai_semaphores_lock = threading.Lock()
+
+
+def _ai_semaphore() -> asyncio.Semaphore:
+    """Return the AI call semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _ai_semaphores_lock:
+        semaphore = _ai_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = _ai_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_AI_CALLS)
+    return semaphore
+
+# Parsed AI summaries keyed by (stage, provider, max_tokens, prompt sha256).
+# Each prompt is built only from that stage's extracted data, so re-analyzing
+# an unchanged repository skips the AI round-trips.
+AI_SUMMARY_CACHE_TTL = 24 * 60 * 60
+_ai_summary_cache: TTLCache = TTLCache(maxsize=512, ttl=AI_SUMMARY_CACHE_TTL)
+
+# Service role (as returned by the services summary) -> component type
+ROLE_TO_COMPONENT_TYPE = MappingProxyType({
+    'api': 'service',
+    'web': 'service',
+    'worker': 'service',
+    'database': 'database',
+    'cache': 'cache',
+    'queue': 'queue',
+    'proxy': 'service',
+    'monitoring': 'monitoring',
+})
+
+# Default port per database type
+DEFAULT_PORTS = MappingProxyType({
+    'postgresql': 5432,
+    'mysql': 3306,
+    'mongodb': 27017,
+    'redis': 6379,
+    'elasticsearch': 9200,
+})
+
+# Contents of the first markdown code fence (optionally tagged json) in an AI
+# response; an unterminated fence runs to the end of the response
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+
+def _prompt_json(data: Any) -> str:
+    """Compact JSON for embedding in a prompt.
+
+    Callers cap list lengths before serializing, so large repositories are not
+    serialized in full only for the prompt slice to discard most of it.
+    """
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 @dataclass
 class ArchitectureComponent:
@@ -84,11 +150,14 @@ class ArchitecturePreprocessor:
             'config_files': config_files
         }
 
-        # Stage 2: AI summarization of each domain (parallel-capable)
-        services_summary = await self._summarize_services(extracted_data, repo_context)
-        api_summary = await self._summarize_api(extracted_data)
-        data_summary = await self._summarize_data_layer(extracted_data)
-        tech_stack = await self._identify_tech_stack(extracted_data, repo_context)
+        # Stage 2: AI summarization of each domain; the calls are independent,
+        # so run them concurrently (each one handles its own failures)
+        services_summary, api_summary, data_summary, tech_stack = await asyncio.gather(
+            self._summarize_services(extracted_data, repo_context),
+            self._summarize_api(extracted_data),
+            self._summarize_data_layer(extracted_data),
+            self._identify_tech_stack(extracted_data, repo_context)
+        )
 
         # Stage 3: Build unified architecture model
         architecture = await self._build_architecture_model(
@@ -104,6 +173,31 @@ class ArchitecturePreprocessor:
         logger.info(f"Preprocessing complete: {len(architecture.components)} components identified")
         return architecture
 
+    async def _ask(self, stage: str, prompt: str, max_tokens: int, default: Dict) -> Dict:
+        """Send a prompt to the AI provider and parse its JSON answer, or return default.
+
+        At most MAX_CONCURRENT_AI_CALLS prompts per event loop are in flight. Parsed
+        answers are cached by prompt content; failed calls raise and unparseable
+        answers return default, and neither is cached.
+        """
+        key = (
+            stage,
+            type(self.ai_provider).__name__,
+            max_tokens,
+            hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        )
+        cached = _ai_summary_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Using cached AI summary for {stage}")
+            return copy.deepcopy(cached)
+
+        async with _ai_semaphore():
+            response = await self.ai_provider.chat(prompt, max_tokens=max_tokens)
+        result = self._parse_json_response(response, default)
+        if result is not default:
+            _ai_summary_cache[key] = copy.deepcopy(result)
+        return result
+
     async def _summarize_services(self, extracted: Dict, context: Dict) -> Dict[str, Any]:
         """Use AI to summarize and interpret service definitions"""
 
@@ -116,10 +210,10 @@ class ArchitecturePreprocessor:
         prompt = f"""Analyze these service definitions and external connections. Return a JSON summary.
 
 Services from docker-compose/kubernetes:
-{json.dumps(services_data, indent=2)[:3000]}
+{_prompt_json(services_data[:30])[:3000]}
 
 External connections detected:
-{json.dumps(connections, indent=2)[:1500]}
+{_prompt_json(connections[:20])[:1500]}
 
 Return JSON with this exact structure:
 {{
@@ -139,8 +233,7 @@ Return JSON with this exact structure:
 Be concise. Only include services you have evidence for."""
 
         try:
-            response = await self.ai_provider.chat(prompt, max_tokens=1500)
-            return self._parse_json_response(response, {'services': [], 'detected_pattern': 'unknown'})
+            return await self._ask('services', prompt, 1500, {'services': [], 'detected_pattern': 'unknown'})
         except Exception as e:
             logger.error(f"Service summarization failed: {e}")
             return {'services': services_data, 'detected_pattern': 'unknown'}
@@ -160,7 +253,7 @@ Be concise. Only include services you have evidence for."""
         prompt = f"""Analyze these API endpoints and categorize them by domain. Return a JSON summary.
 
 API Endpoints:
-{json.dumps(endpoints, indent=2)[:4000]}
+{_prompt_json(endpoints)[:4000]}
 
 Return JSON with this exact structure:
 {{
@@ -180,8 +273,7 @@ Group related endpoints (e.g., /users/*, /auth/* -> "authentication", /repos/* -
 Be concise."""
 
         try:
-            response = await self.ai_provider.chat(prompt, max_tokens=1200)
-            result = self._parse_json_response(response, {'domains': {}, 'total_endpoints': len(endpoints)})
+            result = await self._ask('api', prompt, 1200, {'domains': {}, 'total_endpoints': len(endpoints)})
             result['total_endpoints'] = len(extracted.get('api_endpoints', []))  # Use actual count
             return result
         except Exception as e:
@@ -201,10 +293,10 @@ Be concise."""
         prompt = f"""Analyze these database models and connections. Return a JSON summary.
 
 Database Models:
-{json.dumps(models, indent=2)[:3000]}
+{_prompt_json(models[:30])[:3000]}
 
 Database Connections:
-{json.dumps(connections, indent=2)[:1000]}
+{_prompt_json(connections[:20])[:1000]}
 
 Return JSON with this exact structure:
 {{
@@ -224,8 +316,7 @@ Return JSON with this exact structure:
 Focus on the core entities. Be concise."""
 
         try:
-            response = await self.ai_provider.chat(prompt, max_tokens=1200)
-            return self._parse_json_response(response, {'models': [], 'database_type': 'unknown'})
+            return await self._ask('data_layer', prompt, 1200, {'models': [], 'database_type': 'unknown'})
         except Exception as e:
             logger.error(f"Data layer summarization failed: {e}")
             return {'models': models, 'database_type': 'unknown'}
@@ -246,7 +337,7 @@ Focus on the core entities. Be concise."""
         prompt = f"""Identify the technology stack from this data. Return JSON.
 
 Top imported dependencies:
-{json.dumps(top_deps, indent=2)}
+{_prompt_json(top_deps)}
 
 Config files preview:
 {config_str[:2500]}
@@ -267,8 +358,7 @@ Return JSON with this exact structure:
 Only include technologies you have evidence for. Empty arrays are fine."""
 
         try:
-            response = await self.ai_provider.chat(prompt, max_tokens=800)
-            return self._parse_json_response(response, {'languages': [], 'frameworks': []})
+            return await self._ask('tech_stack', prompt, 800, {'languages': [], 'frameworks': []})
         except Exception as e:
             logger.error(f"Tech stack identification failed: {e}")
             return {'languages': [], 'frameworks': []}
@@ -364,30 +454,15 @@ Only include technologies you have evidence for. Empty arrays are fine."""
             confidence_notes=confidence_notes
         )
 
-    def _map_role_to_type(self, role: str) -> str:
+    @staticmethod
+    def _map_role_to_type(role: str) -> str:
         """Map service role to component type"""
-        mapping = {
-            'api': 'service',
-            'web': 'service',
-            'worker': 'service',
-            'database': 'database',
-            'cache': 'cache',
-            'queue': 'queue',
-            'proxy': 'service',
-            'monitoring': 'monitoring',
-        }
-        return mapping.get(role, 'service')
+        return ROLE_TO_COMPONENT_TYPE.get(role, 'service')
 
-    def _default_port(self, db_type: str) -> Optional[int]:
+    @staticmethod
+    def _default_port(db_type: str) -> Optional[int]:
         """Get default port for database type"""
-        ports = {
-            'postgresql': 5432,
-            'mysql': 3306,
-            'mongodb': 27017,
-            'redis': 6379,
-            'elasticsearch': 9200,
-        }
-        return ports.get(db_type.lower())
+        return DEFAULT_PORTS.get(db_type.lower())
 
     def _detect_cloud_from_tech(self, tech_stack: Dict) -> Optional[str]:
         """Detect cloud provider from tech stack"""
@@ -414,17 +489,12 @@ Only include technologies you have evidence for. Empty arrays are fine."""
         """Parse JSON from AI response, handling markdown code blocks"""
         try:
             # Try to extract JSON from markdown code block
-            if '```json' in response:
-                start = response.find('```json') + 7
-                end = response.find('```', start)
-                response = response[start:end].strip()
-            elif '```' in response:
-                start = response.find('```') + 3
-                end = response.find('```', start)
-                response = response[start:end].strip()
-
-            return json.loads(response)
-        except json.JSONDecodeError as e:
+            fence = _CODE_FENCE_RE.search(response)
+            if fence:
+                response = fence.group(1)
+
+            return orjson.loads(response.strip())
+        except orjson.JSONDecodeError as e:
             logger.warning(f"Failed to parse JSON response: {e}")
             return default
 
@@ -448,57 +518,65 @@ def build_diagram_prompt_from_preprocessed(architecture: PreprocessedArchitectur
     Build a focused diagram generation prompt from preprocessed architecture data.
     This replaces the raw file-based prompt with structured data.
     """
-
-    components_desc = []
+    api = architecture.api_summary
+    data = architecture.data_layer
+
+    # Every line goes into one list that is joined once at the end
+    lines = [
+        "Generate a Python architecture diagram using the `diagrams` library based on this VERIFIED architecture data.",
+        "",
+        f"## Project: {architecture.project_name}",
+        f"- Type: {architecture.project_type}",
+        f"- Cloud/Platform: {architecture.cloud_provider or 'Generic/Docker'}",
+        "",
+        "## Components (VERIFIED):",
+    ]
     for comp in architecture.components:
         conn_str = f" -> connects to: {', '.join(comp.connects_to)}" if comp.connects_to else ""
-        components_desc.append(
+        lines.append(
             f"- {comp.name} ({comp.type}): {comp.technology or 'unknown tech'}"
             f"{f' on port {comp.port}' if comp.port else ''}{conn_str}"
         )
+    if not architecture.components:
+        lines.append("- Main application service")
 
-    api_domains = architecture.api_summary.get('domains', {})
-    api_desc = []
+    lines += ["", "## API Structure:"]
+    api_domains = api.get('domains', {})
     for domain, info in api_domains.items():
-        api_desc.append(f"- {domain}: {info.get('description', '')} ({info.get('endpoints_count', 0)} endpoints)")
-
-    external_desc = [f"- {ext['name']} ({ext['type']})" for ext in architecture.external_integrations]
-
-    tech_desc = []
+        lines.append(f"- {domain}: {info.get('description', '')} ({info.get('endpoints_count', 0)} endpoints)")
+    if not api_domains:
+        lines.append("- API structure not fully detected")
+    lines += [
+        f"- Style: {api.get('api_style', 'REST')}",
+        f"- Total endpoints: {api.get('total_endpoints', 'unknown')}",
+        "",
+        "## Data Layer:",
+        f"- Database: {data.get('database_type', 'unknown')}",
+        f"- ORM: {data.get('orm', 'unknown')}",
+        f"- Schema pattern: {data.get('schema_pattern', 'unknown')}",
+        "",
+        "## External Integrations:",
+    ]
+    for ext in architecture.external_integrations:
+        lines.append(f"- {ext['name']} ({ext['type']})")
+    if not architecture.external_integrations:
+        lines.append("- No external integrations detected")
+
+    lines += ["", "## Tech Stack:"]
+    tech_lines = len(lines)
     for category, items in architecture.tech_stack.items():
         if items:
-            tech_desc.append(f"- {category}: {', '.join(items)}")
-
-    confidence_str = "\n".join(f"- {note}" for note in architecture.confidence_notes) if architecture.confidence_notes else "No major gaps identified."
-
-    prompt = f"""Generate a Python architecture diagram using the `diagrams` library based on this VERIFIED architecture data.
-
-## Project: {architecture.project_name}
-- Type: {architecture.project_type}
-- Cloud/Platform: {architecture.cloud_provider or 'Generic/Docker'}
-
-## Components (VERIFIED):
-{chr(10).join(components_desc) if components_desc else '- Main application service'}
-
-## API Structure:
-{chr(10).join(api_desc) if api_desc else '- API structure not fully detected'}
-- Style: {architecture.api_summary.get('api_style', 'REST')}
-- Total endpoints: {architecture.api_summary.get('total_endpoints', 'unknown')}
-
-## Data Layer:
-- Database: {architecture.data_layer.get('database_type', 'unknown')}
-- ORM: {architecture.data_layer.get('orm', 'unknown')}
-- Schema pattern: {architecture.data_layer.get('schema_pattern', 'unknown')}
-
-## External Integrations:
-{chr(10).join(external_desc) if external_desc else '- No external integrations detected'}
-
-## Tech Stack:
-{chr(10).join(tech_desc) if tech_desc else '- Tech stack not fully identified'}
+            lines.append(f"- {category}: {', '.join(items)}")
+    if len(lines) == tech_lines:
+        lines.append("- Tech stack not fully identified")
 
-## Confidence Notes:
-{confidence_str}
+    lines += ["", "## Confidence Notes:"]
+    for note in architecture.confidence_notes:
+        lines.append(f"- {note}")
+    if not architecture.confidence_notes:
+        lines.append("No major gaps identified.")
 
+    lines.append(f"""
 ---
 
 **INSTRUCTIONS:**
@@ -517,6 +595,6 @@ def build_diagram_prompt_from_preprocessed(architecture: PreprocessedArchitectur
 
 ```python
 # Your diagram code here
-```"""
+```""")
 
-    return prompt
+    return "\n".join(lines)